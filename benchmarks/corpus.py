@@ -0,0 +1,66 @@
+import random
+import re
+from pathlib import Path
+
+from django.conf.locale import LANG_INFO
+
+# Language codes the .stew parser accepts, the most common ones first.
+COMMON_LANGS = ['en', 'ru', 'de', 'fr', 'es', 'it', 'nl', 'pl', 'tr']
+LANGS = COMMON_LANGS + sorted(
+    lang for lang in LANG_INFO
+    if re.fullmatch(r'[-_a-zA-Z]+', lang) and lang not in COMMON_LANGS)
+
+WORDS = ('quick brown fox jumps over the lazy dog and runs away from the '
+         'angry farmer who lives in a small house near the river').split()
+
+
+def sentence(rng, length=8):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+# Returns the lines of a .stew file and, for every key in it, the arguments
+# translate() should be called with.
+def stew_file(rng, file_index, keys, langs, plural_forms, plural_ratio):
+    lines = []
+    calls = []
+    for i in range(keys):
+        key = f'key_{file_index}_{i}'
+        lines.append(f'[{key}]')
+        if rng.random() < plural_ratio:
+            calls.append((key, (rng.randint(0, 100),), {}))
+            for lang in langs:
+                lines.append(f'    {lang} = {{}} {sentence(rng)}')
+                for form in range(1, plural_forms):
+                    lines.append(f'    {lang}[{form}] = {{}} {sentence(rng)}')
+        elif i % 3 == 0:
+            calls.append((key, (), {'name': 'Alice'}))
+            lines.extend(f'    {lang} = {sentence(rng)}, {{name}}' for lang in langs)
+        else:
+            calls.append((key, (), {}))
+            lines.extend(f'    {lang} = {sentence(rng)}' for lang in langs)
+        lines.append('')
+    return lines, calls
+
+
+# Writes locale_dirs locale dirs, each with files_per_dir .stew files of keys
+# keys translated into the given number of languages, and the LC_MESSAGES
+# folders of those languages. Returns the locale dirs, the languages and the
+# (key, args, kwargs) of every key.
+def write_corpus(base_dir, locale_dirs=2, files_per_dir=2, keys=500, langs=10,
+                 plural_forms=3, plural_ratio=0.2, seed=0):
+    rng = random.Random(seed)
+    langs = LANGS[:langs]
+    written_dirs = []
+    calls = []
+    for dir_index in range(locale_dirs):
+        locale_dir = Path(base_dir) / f'app_{dir_index}' / 'locale'
+        for lang in langs:
+            (locale_dir / lang / 'LC_MESSAGES').mkdir(parents=True, exist_ok=True)
+        for file_index in range(files_per_dir):
+            lines, file_calls = stew_file(
+                rng, dir_index * files_per_dir + file_index, keys, langs,
+                plural_forms, plural_ratio)
+            (locale_dir / f'strings_{file_index}.stew').write_text('\n'.join(lines) + '\n')
+            calls.extend(file_calls)
+        written_dirs.append(locale_dir)
+    return written_dirs, langs, calls
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    BENCHMARKS.append(func)
+    return func
+
+
+# Runs func repeat times, calling setup (untimed) before each run. ops is the
+# number of operations a run performs, used to report the throughput.
+def timed(func, repeat, setup=None, ops=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    result = {
+        'repeat': repeat,
+        'min_seconds': min(timings),
+        'mean_seconds': sum(timings) / len(timings),
+    }
+    if ops is not None:
+        result['ops'] = ops
+        result['ops_per_second'] = ops / min(timings)
+    return result
+
+
+class Corpus:
+    def __init__(self, base_dir, params):
+        from benchmarks.corpus import write_corpus
+        self.base_dir = base_dir
+        self.params = params
+        self.locale_dirs, self.langs, self.calls = write_corpus(
+            base_dir, locale_dirs=params['locale_dirs'], files_per_dir=params['files_per_dir'],
+            keys=params['keys'], langs=params['langs'], plural_forms=params['plural_forms'],
+            plural_ratio=params['plural_ratio'])
+        # The language translate() is benchmarked in, other than the default one.
+        self.lang = self.langs[1] if len(self.langs) > 1 else self.langs[0]
+
+
+    def remove_outputs(self):
+        from django_localizer.manifest import MANIFEST_NAME
+        for locale_dir in self.locale_dirs:
+            try:
+                (locale_dir / MANIFEST_NAME).unlink()
+            except FileNotFoundError:
+                pass
+            for catalog in locale_dir.glob('*/LC_MESSAGES/django.*'):
+                catalog.unlink()
+
+
+    def processors(self, parse=True):
+        from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+        processors = [LocalePathProcessor(locale_dir) for locale_dir in self.locale_dirs]
+        if parse:
+            for processor in processors:
+                processor.strings_txt
+        return processors
+
+
+@benchmark
+def generate(corpus, repeat):
+    from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+
+    def process():
+        for locale_dir in corpus.locale_dirs:
+            LocalePathProcessor(locale_dir).process()
+
+    def check():
+        for locale_dir in corpus.locale_dirs:
+            LocalePathProcessor(locale_dir, read_only=True).check()
+
+    return {
+        'generate_cold': timed(process, repeat, setup=corpus.remove_outputs),
+        'generate_unchanged': timed(process, repeat),
+        'check': timed(check, repeat),
+    }
+
+
+# Both include parsing the .stew files.
+@benchmark
+def write_catalogs(corpus, repeat):
+    def write_per_language():
+        for processor in corpus.processors():
+            for lang in corpus.langs:
+                processor.build_language(lang, force=True)
+
+    def write_single_pass():
+        for processor in corpus.processors(parse=False):
+            processor.build_languages(force=True)
+
+    catalogs = len(corpus.locale_dirs) * len(corpus.langs)
+    return {
+        'write_catalogs_per_language': timed(
+            write_per_language, repeat, setup=corpus.remove_outputs, ops=catalogs),
+        'write_catalogs_single_pass': timed(
+            write_single_pass, repeat, setup=corpus.remove_outputs, ops=catalogs),
+    }
+
+
+@benchmark
+def translate_calls(corpus, repeat):
+    from django.utils import translation
+    from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+    from django.utils.functional import lazy
+    from django_localizer.translate import (
+        clear_cache, disable_stats, enable_stats, get_translator, translate, translate_lazy,
+        translate_many)
+
+    for locale_dir in corpus.locale_dirs:
+        LocalePathProcessor(locale_dir).process()
+
+    def translate_all():
+        for key, args, kwargs in corpus.calls:
+            translate(key, *args, **kwargs)
+
+    def translate_all_at_once():
+        translate_many(corpus.calls)
+
+    def translate_all_with_translator():
+        translator = get_translator(corpus.lang)
+        for key, args, kwargs in corpus.calls:
+            translator.translate(key, *args, **kwargs)
+
+    # Module level strings, created once and turned into strings on every use.
+    django_lazy = lazy(translate, str)
+    lazy_strings = [translate_lazy(key, *args, **kwargs) for key, args, kwargs in corpus.calls]
+    django_lazy_strings = [django_lazy(key, *args, **kwargs) for key, args, kwargs in corpus.calls]
+
+    calls = len(corpus.calls)
+    with translation.override(corpus.lang):
+        translate_all()
+        results = {
+            'translate_lazy_str': timed(lambda: [str(s) for s in lazy_strings], repeat, ops=calls),
+            'django_lazy_str': timed(
+                lambda: [str(s) for s in django_lazy_strings], repeat, ops=calls),
+            'translate_cold': timed(translate_all, repeat, setup=clear_cache, ops=calls),
+            'translate_warm': timed(translate_all, repeat, ops=calls),
+            'translate_many': timed(translate_all_at_once, repeat, ops=calls),
+            'translator_cold': timed(
+                translate_all_with_translator, repeat, setup=clear_cache, ops=calls),
+            'translator_warm': timed(translate_all_with_translator, repeat, ops=calls),
+            'translate_sampled_stats': timed(
+                translate_all, repeat, setup=lambda: enable_stats(0.01, flush_every=0), ops=calls),
+            'translate_full_stats': timed(
+                translate_all, repeat, setup=lambda: enable_stats(1.0, flush_every=0), ops=calls),
+        }
+        disable_stats()
+        return results
+
+
+@benchmark
+def mmap_catalog(corpus, repeat):
+    from unittest import mock
+    from django.utils import translation
+    from django_localizer.catalog import update_indexes
+    from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+    from django_localizer.settings import LOCALIZER
+    from django_localizer.translate import clear_cache, translate
+
+    for locale_dir in corpus.locale_dirs:
+        LocalePathProcessor(locale_dir).process()
+    catalog_dir = corpus.base_dir / 'catalogs'
+
+    def translate_all():
+        for key, args, kwargs in corpus.calls:
+            translate(key, *args, **kwargs)
+
+    calls = len(corpus.calls)
+    with mock.patch.dict(LOCALIZER, {'MMAP_CATALOG_DIR': str(catalog_dir)}), \
+            translation.override(corpus.lang):
+        result = {
+            'mmap_write_indexes': timed(
+                lambda: update_indexes(catalog_dir, corpus.locale_dirs, set(), force=True),
+                repeat, ops=len(corpus.langs)),
+        }
+        translate_all()
+        result.update({
+            'mmap_translate_cold': timed(translate_all, repeat, setup=clear_cache, ops=calls),
+            'mmap_translate_warm': timed(translate_all, repeat, ops=calls),
+        })
+    clear_cache()
+    return result
+
+
+@benchmark
+def sharded_catalog(corpus, repeat):
+    from unittest import mock
+    from django.utils import translation
+    from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+    from django_localizer.settings import LOCALIZER
+    from django_localizer.shards import write_shards
+    from django_localizer.translate import clear_cache, translate
+
+    for locale_dir in corpus.locale_dirs:
+        LocalePathProcessor(locale_dir).process()
+    shard_dir = corpus.base_dir / 'shards'
+    processors = corpus.processors()
+
+    def translate_all():
+        for key, args, kwargs in corpus.calls:
+            translate(key, *args, **kwargs)
+
+    # A worker serving a single page: one key, and the one shard it is in.
+    def translate_one():
+        key, args, kwargs = corpus.calls[0]
+        translate(key, *args, **kwargs)
+
+    calls = len(corpus.calls)
+    with mock.patch.dict(LOCALIZER, {'SHARD_DIR': str(shard_dir)}), \
+            translation.override(corpus.lang):
+        result = {
+            'shards_write': timed(lambda: write_shards(shard_dir, processors), repeat),
+        }
+        translate_all()
+        result.update({
+            'shards_translate_first_key': timed(translate_one, repeat, setup=clear_cache),
+            'shards_translate_cold': timed(translate_all, repeat, setup=clear_cache, ops=calls),
+            'shards_translate_warm': timed(translate_all, repeat, ops=calls),
+        })
+    clear_cache()
+    return result
+
+
+# Picks the plural form of 10000 numbers in languages of increasing rule
+# complexity, through gettext's compiled expression and the Python function.
+@benchmark
+def plural_rules(corpus, repeat):
+    import gettext
+    from django_localizer.plurals import get_plural_rule
+
+    numbers = range(10000)
+    result = {}
+    for lang in ('de', 'pl', 'ru', 'ar'):
+        rule = get_plural_rule(lang)
+        expression = gettext.c2py(rule.expression)
+        result[f'plural_{lang}_gettext'] = timed(
+            lambda: [expression(n) for n in numbers], repeat, ops=len(numbers))
+        result[f'plural_{lang}_compiled'] = timed(
+            lambda: [rule.func(n) for n in numbers], repeat, ops=len(numbers))
+    return result
+
+
+@benchmark
+def template_tags(corpus, repeat):
+    from django.template import Context, Engine
+    from django.utils import translation
+
+    engine = Engine(libraries={'translate': 'django_localizer.templatetags.translate'})
+    calls = corpus.calls[:200]
+    literal_tags = []
+    for key, args, kwargs in calls:
+        bits = [f"'{key}'", *map(str, args), *(f"{name}='{value}'" for name, value in kwargs.items())]
+        literal_tags.append(f"{{% translate {' '.join(bits)} %}}")
+    literal = engine.from_string('{% load translate %}' + '\n'.join(literal_tags))
+    variable = engine.from_string(
+        '{% load translate %}{% for key in keys %}{% translate key name=name %}\n{% endfor %}')
+    context = {'keys': [key for key, args, _ in calls if not args], 'name': 'Alice'}
+
+    with translation.override(corpus.lang):
+        return {
+            'template_literal_tags': timed(
+                lambda: literal.render(Context()), repeat, ops=len(literal_tags)),
+            'template_variable_tags': timed(
+                lambda: variable.render(Context(context)), repeat, ops=len(context['keys'])),
+        }
+
+
+def run_benchmarks(params, names=None):
+    from django.test.utils import override_settings
+    from django_localizer import __version__
+
+    results = {}
+    with tempfile.TemporaryDirectory() as base_dir:
+        corpus = Corpus(Path(base_dir), params)
+        with override_settings(
+                BASE_DIR=base_dir, LOCALE_PATHS=[str(d) for d in corpus.locale_dirs]):
+            for func in BENCHMARKS:
+                if names and func.__name__ not in names:
+                    continue
+                results.update(func(corpus, params['repeat']))
+    return {
+        'django_localizer': __version__,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'params': params,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark django_localizer.')
+    parser.add_argument('--locale-dirs', type=int, default=2)
+    parser.add_argument('--files-per-dir', type=int, default=2)
+    parser.add_argument('--keys', type=int, default=500, help='Keys per .stew file.')
+    parser.add_argument('--langs', type=int, default=10)
+    parser.add_argument('--plural-forms', type=int, default=3)
+    parser.add_argument('--plural-ratio', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', choices=[func.__name__ for func in BENCHMARKS])
+    parser.add_argument('--output', help='Write the JSON results to this file instead of stdout.')
+    options = parser.parse_args(argv)
+
+    settings.configure(
+        INSTALLED_APPS=['django_localizer'],
+        USE_I18N=True,
+        LANGUAGE_CODE='en',
+    )
+    django.setup()
+
+    params = {
+        name: getattr(options, name)
+        for name in ('locale_dirs', 'files_per_dir', 'keys', 'langs', 'plural_forms',
+                     'plural_ratio', 'repeat')
+    }
+    report = json.dumps(run_benchmarks(params, options.only), indent=2)
+    if options.output:
+        Path(options.output).write_text(report + '\n')
+    else:
+        sys.stdout.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,3 @@
 __version__ = '0.0.1'
 
-from django_localizer.translate import translate
+from django_localizer.translate import get_translator, translate, translate_lazy, translate_many
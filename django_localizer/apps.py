@@ -1,6 +1,17 @@
 # -*- coding: utf-8
 from django.apps import AppConfig
+from django.core.signals import setting_changed
+from django.utils.autoreload import file_changed
 
 
 class DjangoLocalizeConfig(AppConfig):
     name = 'django_localizer'
+
+    def ready(self):
+        from django_localizer.settings import LOCALIZER
+        from django_localizer.translate import (
+            clear_cache_on_file_change, clear_cache_on_setting_change, warm_up)
+        file_changed.connect(clear_cache_on_file_change)
+        setting_changed.connect(clear_cache_on_setting_change)
+        if LOCALIZER['PRELOAD_LANGUAGES']:
+            warm_up(LOCALIZER['PRELOAD_LANGUAGES'], LOCALIZER['PRELOAD_KEYS'])
@@ -0,0 +1,159 @@
+import gettext
+import mmap
+import os
+import struct
+import zlib
+
+from django.utils.translation import to_locale
+
+from django_localizer.files import write_if_changed
+from django_localizer.plurals import compile_plural
+
+MAGIC = b'DLCI'
+VERSION = 1
+HEADER = struct.Struct('<4sIIII')
+ENTRY = struct.Struct('<IIIII')
+SLOT = struct.Struct('<I')
+
+
+def index_path(catalog_dir, lang):
+    return os.path.join(catalog_dir, f'{lang}.idx')
+
+
+def plural_expression(plural_forms):
+    _, _, plural = plural_forms.partition('plural=')
+    return plural.strip().rstrip(';') or 'n != 1'
+
+
+# The layout of an index: header, plural expression, hash table of entry
+# numbers (open addressing, 0 is an empty slot), entries, strings. Every entry
+# holds the key, whether it is a plural entry and its forms joined with NULs.
+def generate_index(plural, entries):
+    plural = plural.encode('utf-8')
+    keys = sorted(entries)
+    size = 2 * len(keys) + 1
+    table = [0] * size
+    for number, key in enumerate(keys, 1):
+        slot = zlib.crc32(key.encode('utf-8')) % size
+        while table[slot]:
+            slot = (slot + 1) % size
+        table[slot] = number
+
+    offset = HEADER.size + len(plural) + SLOT.size * size + ENTRY.size * len(keys)
+    records = []
+    strings = []
+    for key in keys:
+        is_plural, forms = entries[key]
+        key = key.encode('utf-8')
+        forms = '\0'.join(forms).encode('utf-8')
+        records.append(ENTRY.pack(offset, len(key), offset + len(key), len(forms), is_plural))
+        strings.extend((key, forms))
+        offset += len(key) + len(forms)
+
+    return b''.join([
+        HEADER.pack(MAGIC, VERSION, len(keys), size, len(plural)),
+        plural,
+        struct.pack(f'<{size}I', *table),
+        *records,
+        *strings,
+    ])
+
+
+def read_mo_entries(mo_file):
+    with open(mo_file, 'rb') as infile:
+        translations = gettext.GNUTranslations(infile)
+    entries = {}
+    for msgid, msgstr in translations._catalog.items():
+        if isinstance(msgid, tuple):
+            msgid, index = msgid
+            entries.setdefault(msgid, (True, {}))[1][index] = msgstr
+        elif msgid:
+            entries[msgid] = (False, {0: msgstr})
+    plural = plural_expression(translations._info.get('plural-forms', ''))
+    return plural, {
+        msgid: (is_plural, [forms[i] for i in sorted(forms)])
+        for msgid, (is_plural, forms) in entries.items()
+    }
+
+
+# Merges the .mo files of one language from all the locale dirs into a single
+# index. Like Django, the locale dirs that come first take precedence.
+def write_index(catalog_dir, locale_dirs, lang):
+    plural = None
+    entries = {}
+    for locale_dir in locale_dirs:
+        mo_file = locale_dir / lang / 'LC_MESSAGES' / 'django.mo'
+        if not mo_file.exists():
+            continue
+        mo_plural, mo_entries = read_mo_entries(mo_file)
+        plural = plural or mo_plural
+        for msgid, entry in mo_entries.items():
+            entries.setdefault(msgid, entry)
+    return write_if_changed(index_path(catalog_dir, lang), generate_index(plural or 'n != 1', entries))
+
+
+def update_indexes(catalog_dir, locale_dirs, changed_langs, force=False):
+    os.makedirs(catalog_dir, exist_ok=True)
+    langs = {
+        lang_dir.name
+        for locale_dir in locale_dirs if locale_dir.is_dir()
+        for lang_dir in locale_dir.iterdir()
+        if (lang_dir / 'LC_MESSAGES' / 'django.mo').exists()
+    }
+    return [
+        lang for lang in sorted(langs)
+        if (force or lang in changed_langs or not os.path.exists(index_path(catalog_dir, lang)))
+        and write_index(catalog_dir, locale_dirs, lang)
+    ]
+
+
+class MmapCatalog:
+    def __init__(self, file_path):
+        with open(file_path, 'rb') as infile:
+            self.data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self.size, plural_length = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{file_path} is not a django_localizer catalog index')
+        plural = self.data[HEADER.size:HEADER.size + plural_length].decode('utf-8')
+        self.plural = compile_plural(plural)
+        self.table_offset = HEADER.size + plural_length
+        self.entries_offset = self.table_offset + SLOT.size * self.size
+
+
+    # Returns (is_plural, forms) for the key, or None.
+    def get(self, key):
+        data = self.data
+        key = key.encode('utf-8')
+        slot = zlib.crc32(key) % self.size
+        while True:
+            number, = SLOT.unpack_from(data, self.table_offset + slot * SLOT.size)
+            if not number:
+                return None
+            key_offset, key_length, forms_offset, forms_length, is_plural = ENTRY.unpack_from(
+                data, self.entries_offset + (number - 1) * ENTRY.size)
+            if key_length == len(key) and data[key_offset:key_offset + key_length] == key:
+                forms = data[forms_offset:forms_offset + forms_length].decode('utf-8')
+                return bool(is_plural), forms.split('\0')
+            slot = (slot + 1) % self.size
+
+
+_catalogs = {}
+
+
+def get_catalog(catalog_dir, lang):
+    try:
+        return _catalogs[catalog_dir, lang]
+    except KeyError:
+        pass
+    catalog = None
+    for candidate in dict.fromkeys((to_locale(lang), lang, lang.split('-')[0])):
+        file_path = index_path(catalog_dir, candidate)
+        if os.path.exists(file_path):
+            catalog = MmapCatalog(file_path)
+            break
+    _catalogs[catalog_dir, lang] = catalog
+    return catalog
+
+
+def clear_catalogs():
+    _catalogs.clear()
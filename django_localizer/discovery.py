@@ -0,0 +1,120 @@
+import json
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+from django_localizer.settings import LOCALIZER
+
+CACHE_NAME = '.localizer_discovery.json'
+
+
+# Relative LOCALE_PATHS are relative to BASE_DIR.
+def find_locale_dirs():
+    base_dir = Path(settings.BASE_DIR)
+    locale_dirs = [
+        Path(os.path.normpath(base_dir / locale_path)) for locale_path in settings.LOCALE_PATHS]
+
+    for app_config in apps.get_app_configs():
+        app_path = Path(app_config.path)
+        locale_dir = app_path / 'locale'
+        if app_path.parent == base_dir and locale_dir.exists():
+            locale_dirs.append(locale_dir)
+    return locale_dirs
+
+
+def matches(name, rel_path, patterns):
+    return any(fnmatch(name, pattern) or fnmatch(rel_path, pattern) for pattern in patterns)
+
+
+# Walks the locale dir with os.scandir, without descending into excluded
+# directories. Returns the .stew files found and the mtimes of the directories
+# visited, which is all that is needed to tell whether the result is stale.
+def walk_stew_files(locale_dir, include, exclude):
+    stew_files = []
+    dir_mtimes = {}
+    pending = ['']
+    while pending:
+        rel_dir = pending.pop()
+        directory = os.path.join(locale_dir, rel_dir)
+        dir_mtimes[rel_dir] = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if matches(entry.name, rel_path, exclude):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(rel_path)
+                elif entry.is_file() and matches(entry.name, rel_path, include):
+                    stew_files.append(rel_path)
+    return sorted(stew_files), dir_mtimes
+
+
+class DiscoveryCache:
+    def __init__(self, locale_dir, include, exclude):
+        self.path = locale_dir / CACHE_NAME
+        self.locale_dir = locale_dir
+        self.patterns = {'include': include, 'exclude': exclude}
+
+
+    def load(self):
+        try:
+            with open(self.path) as infile:
+                data = json.load(infile)
+        except (OSError, ValueError):
+            return None
+        if data.get('patterns') != self.patterns:
+            return None
+        for rel_dir, mtime in data['dirs'].items():
+            try:
+                if os.stat(os.path.join(self.locale_dir, rel_dir)).st_mtime_ns != mtime:
+                    return None
+            except OSError:
+                return None
+        return data['stew_files']
+
+
+    # Called before walking the locale dir: creating the cache file afterwards
+    # would change the mtime of the locale dir recorded in it.
+    def touch(self):
+        try:
+            self.path.touch()
+        except OSError:
+            pass
+
+
+    def save(self, stew_files, dir_mtimes):
+        data = {
+            'patterns': self.patterns,
+            'stew_files': stew_files,
+            'dirs': dir_mtimes,
+        }
+        try:
+            with open(self.path, 'w') as outfile:
+                json.dump(data, outfile, indent=2, sort_keys=True)
+        except OSError:
+            pass
+
+
+# With save_cache false, a stale cache is not written again, so that nothing
+# is written at all.
+def find_stew_files(locale_dir, save_cache=True):
+    include = LOCALIZER['INCLUDE']
+    exclude = LOCALIZER['EXCLUDE']
+    if not locale_dir.is_dir():
+        return []
+    if not LOCALIZER['DISCOVERY_CACHE']:
+        stew_files, _ = walk_stew_files(locale_dir, include, exclude)
+        return stew_files
+
+    cache = DiscoveryCache(locale_dir, include, exclude)
+    stew_files = cache.load()
+    if stew_files is None:
+        if save_cache:
+            cache.touch()
+        stew_files, dir_mtimes = walk_stew_files(locale_dir, include, exclude)
+        if save_cache:
+            cache.save(stew_files, dir_mtimes)
+    return stew_files
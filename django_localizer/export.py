@@ -0,0 +1,75 @@
+import json
+import os
+from pathlib import Path
+
+from django_localizer.files import write_if_changed
+from django_localizer.manifest import hash_bytes
+from django_localizer.plurals import get_plural_rule
+
+BUNDLES_NAME = 'bundles.json'
+DIGEST_LENGTH = 12
+
+
+# The messages of every language of the .stew files of all the locale dirs,
+# as a string for a singular key and a list of forms for a plural one. Like
+# the catalogs, the first definition of a key wins.
+def collect_messages(processors):
+    messages = {}
+    for processor in processors:
+        for _, msgid, _, translations in processor.exported_entries:
+            for lang, msgstr in translations.items():
+                messages.setdefault(lang, {}).setdefault(msgid, msgstr)
+    return messages
+
+
+# The plural expression is valid JavaScript as well, so clients can compile it
+# with new Function('n', 'return ' + bundle.plural).
+def generate_bundle(lang, messages):
+    rule = get_plural_rule(lang)
+    bundle = {
+        'lang': lang,
+        'nplurals': rule.nplurals,
+        'plural': rule.expression,
+        'messages': messages,
+    }
+    return json.dumps(
+        bundle, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def bundle_name(lang, data):
+    return f'{lang}.{hash_bytes(data)[:DIGEST_LENGTH]}.json'
+
+
+def load_bundles(export_dir):
+    try:
+        with open(Path(export_dir) / BUNDLES_NAME) as infile:
+            return json.load(infile)
+    except (OSError, ValueError):
+        return {}
+
+
+# Writes one bundle per language, named after the hash of its content, and
+# the bundles.json file mapping the languages to their current bundles.
+# Bundles that are no longer current are removed. Returns the languages
+# whose bundles changed.
+def export_bundles(export_dir, processors):
+    export_dir = Path(export_dir)
+    os.makedirs(export_dir, exist_ok=True)
+    previous = load_bundles(export_dir)
+    bundles = {}
+    for lang, messages in sorted(collect_messages(processors).items()):
+        data = generate_bundle(lang, messages)
+        bundles[lang] = bundle_name(lang, data)
+        write_if_changed(export_dir / bundles[lang], data)
+
+    current = set(bundles.values())
+    for name in previous.values():
+        if name not in current:
+            try:
+                (export_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+    manifest = json.dumps(bundles, indent=2, sort_keys=True) + '\n'
+    write_if_changed(export_dir / BUNDLES_NAME, manifest.encode('utf-8'))
+    return sorted(lang for lang in bundles.keys() | previous.keys()
+                  if bundles.get(lang) != previous.get(lang))
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import tempfile
+
+CHUNK_SIZE = 1 << 16
+
+
+def file_mode(file_path):
+    try:
+        return os.stat(file_path).st_mode & 0o777
+    except FileNotFoundError:
+        return 0o644
+
+
+def temporary_file(file_path):
+    return tempfile.mkstemp(
+        dir=os.path.dirname(file_path), prefix=f'.{os.path.basename(file_path)}.', suffix='.tmp')
+
+
+# Writes to a temporary file next to the target and renames it over the
+# target, so that readers never see a half-written file.
+def write_atomic(file_path, data):
+    mode = file_mode(file_path)
+    fd, tmp_path = temporary_file(file_path)
+    try:
+        with os.fdopen(fd, 'wb') as outfile:
+            outfile.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def has_content(file_path, data):
+    try:
+        if os.stat(file_path).st_size != len(data):
+            return False
+        with open(file_path, 'rb') as infile:
+            return infile.read() == data
+    except FileNotFoundError:
+        return False
+
+
+# Leaves the file, and its mtime, alone if it already has the given content.
+# Returns whether the file was written.
+def write_if_changed(file_path, data):
+    if has_content(file_path, data):
+        return False
+    write_atomic(file_path, data)
+    return True
+
+
+def hash_file_chunks(file_path):
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+# Hashes the content meant for a file without writing it, to tell whether
+# the file already has it.
+class HashingWriter:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+
+    def write(self, data):
+        self.hash.update(data)
+        self.size += len(data)
+
+
+    def digest(self):
+        return self.hash.hexdigest()
+
+
+    def is_unchanged(self):
+        try:
+            if os.stat(self.file_path).st_size != self.size:
+                return False
+            return hash_file_chunks(self.file_path) == self.digest()
+        except FileNotFoundError:
+            return False
+
+
+    def discard(self):
+        pass
+
+
+# The streaming counterpart of write_if_changed: the content goes straight to
+# a temporary file while being hashed, and commit() only moves it over the
+# target if the target does not have the same content already.
+class AtomicFileWriter(HashingWriter):
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        fd, self.tmp_path = temporary_file(file_path)
+        self.file = os.fdopen(fd, 'wb')
+
+
+    def write(self, data):
+        self.file.write(data)
+        super().write(data)
+
+
+    def commit(self):
+        self.file.close()
+        if self.is_unchanged():
+            os.unlink(self.tmp_path)
+            return False
+        os.chmod(self.tmp_path, file_mode(self.file_path))
+        os.replace(self.tmp_path, self.file_path)
+        return True
+
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.unlink(self.tmp_path)
+        except FileNotFoundError:
+            pass
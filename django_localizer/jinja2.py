@@ -0,0 +1,75 @@
+from django.utils.translation import get_language
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from django_localizer.translate import cache_generation, get_stats, translate, translate_many
+
+
+# Adds the translate and translate_many functions to the environment, and the
+# translate tag:
+#
+#     {% translate 'fox_jumps_dog', n_foxes, dog_number=dog_number %}
+#
+# When the key and the arguments of the tag are all literals, they are
+# compiled into the template as one constant, and the translation is looked
+# up once per language rather than on every render.
+class TranslateExtension(Extension):
+    tags = {'translate'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.globals.update(translate=translate, translate_many=translate_many)
+        # Results of literal-only invocations, by language and invocation.
+        self.results = {}
+        self.generation = None
+
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = parser.parse_expression()
+        args = []
+        kwargs = []
+        while parser.stream.skip_if('comma'):
+            if parser.stream.current.type == 'name' and parser.stream.look().type == 'assign':
+                name = next(parser.stream).value
+                parser.stream.expect('assign')
+                kwargs.append(nodes.Keyword(name, parser.parse_expression(), lineno=lineno))
+            elif kwargs:
+                parser.fail(
+                    "'translate' received a positional argument after keyword arguments", lineno)
+            else:
+                args.append(parser.parse_expression())
+
+        values = [key, *args, *(kwarg.value for kwarg in kwargs)]
+        if all(isinstance(value, nodes.Const) for value in values):
+            invocation = (
+                key.value,
+                tuple(arg.value for arg in args),
+                tuple((kwarg.key, kwarg.value.value) for kwarg in kwargs),
+            )
+            call = self.call_method('_translate_literal', [nodes.Const(invocation)], lineno=lineno)
+        else:
+            call = self.call_method('_translate', [key, *args], kwargs, lineno=lineno)
+        return nodes.Output([call], lineno=lineno)
+
+
+    def _translate(self, key, *args, **kwargs):
+        return translate(key, *args, **kwargs)
+
+
+    # While the instrumentation is on, every invocation goes through
+    # translate(), so that its calls are counted.
+    def _translate_literal(self, invocation):
+        key, args, kwargs = invocation
+        if get_stats() is not None:
+            return translate(key, *args, **dict(kwargs))
+        generation = cache_generation()
+        if generation != self.generation:
+            self.results = {}
+            self.generation = generation
+        lang = get_language()
+        try:
+            return self.results[lang, invocation]
+        except KeyError:
+            output = self.results[lang, invocation] = translate(key, *args, **dict(kwargs))
+            return output
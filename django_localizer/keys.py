@@ -0,0 +1,44 @@
+# Where every key was first defined, together with the hashes of its
+# translations, which have to be hashable, so that keys defined again
+# elsewhere are found with one dict lookup each and the translations are not
+# kept. A key defined again is a conflict if any language it has in common
+# with the first definition is translated differently, and a duplicate
+# otherwise.
+class KeyIndex:
+    def __init__(self):
+        self.sources = {}
+        self.duplicates = []
+        self.conflicts = []
+
+
+    # Returns whether this is the first definition of the key.
+    def add(self, key, source, translations):
+        digests = {lang: hash(translation) for lang, translation in translations.items()}
+        first = self.sources.get(key)
+        if first is None:
+            self.sources[key] = (source, digests)
+            return True
+        first_source, first_digests = first
+        if any(first_digests[lang] != digests[lang]
+               for lang in first_digests.keys() & digests.keys()):
+            self.conflicts.append((key, first_source, source))
+        else:
+            self.duplicates.append((key, first_source, source))
+        return False
+
+
+    def source(self, key):
+        return self.sources[key][0]
+
+
+    def warnings(self, duplicates=True):
+        messages = []
+        if duplicates:
+            messages.extend(
+                f'{key} is defined in both {first} and {source}'
+                for key, first, source in self.duplicates)
+        messages.extend(
+            f'{key} is translated differently in {first} and {source}, '
+            f'the translations from {first} are used'
+            for key, first, source in self.conflicts)
+        return messages
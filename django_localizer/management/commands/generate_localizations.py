@@ -1,29 +1,193 @@
+import cProfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from fnmatch import fnmatch
+from itertools import repeat
 from os import path
-from pathlib import Path
+from tempfile import SpooledTemporaryFile
+import json
+import re
+import struct
 
-from django.apps import apps
-from django.core.management import call_command
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from django.utils.functional import cached_property
 
 from stew.stew import Stew
 
+from django_localizer.catalog import read_mo_entries, update_indexes
+from django_localizer.discovery import find_locale_dirs, find_stew_files
+from django_localizer.export import BUNDLES_NAME, export_bundles
+from django_localizer.files import AtomicFileWriter, HashingWriter, has_content, write_if_changed
+from django_localizer.keys import KeyIndex
+from django_localizer.manifest import (
+    GENERATOR_VERSION, Manifest, hash_bytes, hash_file, load_entries, save_entries)
+from django_localizer.mo import generate_mo, unescape
+from django_localizer.placeholders import (
+    PlaceholderError, base_languages, check_placeholders, format_placeholders)
+from django_localizer.plurals import plural_forms
+from django_localizer.settings import LOCALIZER
+from django_localizer.shards import SHARD_INDEX_NAME, write_shards
+from django_localizer.timings import Timings
+from django_localizer.usage import find_used_keys
+from django_localizer.watch import get_watcher
+
+# Size up to which the messages of a .mo file are spooled in memory.
+SPOOL_SIZE = 1 << 20
+MESSAGE_LENGTHS = struct.Struct('<II')
+
 FORMAT_BY_TAG = {
     'comment': '# {}\n',
     'tags': '# tags: {}\n',
 }
 
 
+# Splits an escaped string into the quoted lines of a .po file, breaking after
+# spaces so that the lines fit in width columns, like msgcat does.
+def wrap_po_string(text, width=79):
+    if len(text) + 2 <= width:
+        return [f'"{text}"\n']
+    lines = []
+    line = ''
+    for word in re.findall(r'\S*\s*', text):
+        if line and len(line) + len(word) + 2 > width:
+            lines.append(f'"{line}"\n')
+            line = ''
+        line += word
+    lines.append(f'"{line}"\n')
+    return lines
+
+
+def print_warnings(warnings):
+    for warning in warnings:
+        print(f'WARNING: {warning}\n\n')
+
+
+# Processors of the current worker process, so that the languages of one locale
+# dir that end up in the same worker share a single parse of its .stew files.
+# They are kept, with all their parsed .stew files, until the worker exits.
+_worker_processors = {}
+
+
+# Every task starts with fresh timings, which it returns, so that the command
+# can add up those of all the tasks.
+def _get_worker_processor(locale_dir, dedupe, used_keys):
+    processor = _worker_processors.get((locale_dir, dedupe, used_keys))
+    if processor is None:
+        processor = _worker_processors[locale_dir, dedupe, used_keys] = LocalePathProcessor(
+            locale_dir, dedupe, used_keys, timings=Timings())
+    else:
+        processor.timings = Timings()
+    return processor
+
+
+def prepare_locale_dir(locale_dir, force, dedupe=False, used_keys=None):
+    processor = _get_worker_processor(locale_dir, dedupe, used_keys)
+    return processor.prepare(force), processor.warnings, processor.pruned, processor.timings
+
+
+def build_language(locale_dir, lang, force, dedupe=False, used_keys=None):
+    processor = _get_worker_processor(locale_dir, dedupe, used_keys)
+    return (*processor.build_language(lang, force), processor.timings)
+
+
+def check_locale_dir(locale_dir, dedupe=False, used_keys=None):
+    processor = LocalePathProcessor(locale_dir, dedupe, used_keys, read_only=True)
+    return processor.check(), processor.warnings, processor.timings
+
+
+@contextmanager
+def discarding_on_error(writers):
+    try:
+        yield
+    except BaseException:
+        for writer in writers.values():
+            writer.discard()
+        raise
+
+
+# The messages of the .mo file are spooled, to a temporary file once they
+# outgrow SPOOL_SIZE, and only read back to generate it, so that the writers
+# of all the languages do not hold their messages at the same time.
+class CatalogWriter:
+    def __init__(self, lang_dir, lang, read_only=False):
+        self.lang = lang
+        self.po_file = lang_dir / 'django.po'
+        self.po = HashingWriter(self.po_file) if read_only else AtomicFileWriter(self.po_file)
+        self.spool = SpooledTemporaryFile(SPOOL_SIZE)
+        self.add_message('', PoFileHeader.get_metadata_for_lang(lang))
+        self.write(PoFileHeader.get_header_for_lang(lang))
+
+
+    def write(self, text):
+        self.po.write(text.encode('utf-8'))
+
+
+    # Every message is spooled as the lengths of its encoded msgid and msgstr,
+    # followed by both of them.
+    def add_message(self, msgid, msgstr):
+        msgid, msgstr = msgid.encode('utf-8'), msgstr.encode('utf-8')
+        self.spool.write(MESSAGE_LENGTHS.pack(len(msgid), len(msgstr)) + msgid + msgstr)
+
+
+    def discard(self):
+        self.po.discard()
+        self.spool.close()
+
+
+    # The first message of every msgid wins. Can only be called once.
+    def read_messages(self):
+        messages = {}
+        self.spool.seek(0)
+        data = self.spool.read()
+        self.spool.close()
+        offset = 0
+        while offset < len(data):
+            msgid_length, msgstr_length = MESSAGE_LENGTHS.unpack_from(data, offset)
+            offset += MESSAGE_LENGTHS.size
+            msgstr_offset = offset + msgid_length
+            end = msgstr_offset + msgstr_length
+            messages.setdefault(
+                data[offset:msgstr_offset].decode('utf-8'), data[msgstr_offset:end].decode('utf-8'))
+            offset = end
+        return messages
+
+
 class LocalePathProcessor:
-    def __init__(self, locale_dir):
+    # With used_keys, the keys that are not in it are left out of the
+    # catalogs, and recorded in pruned with the .stew file defining them. A
+    # read only processor can only check the generated files. The time spent
+    # in every stage is recorded in timings.
+    def __init__(self, locale_dir, dedupe=False, used_keys=None, read_only=False,
+                 timings=None):
+        self.dedupe = dedupe
+        self.used_keys = used_keys
+        self.read_only = read_only
+        self.timings = Timings() if timings is None else timings
+        self.pruned = {}
+        self.regenerated = False
         self.all_langs = None
-        self.strings_txt = []
+        self.stew_paths = []
+        self.lang_digests = {}
         self.warnings = []
+        self.errors = []
+        self.base_langs = base_languages()
         self.locale_dir = locale_dir
-        stew_files = self.locale_dir.glob('**/*.stew')
-        for stew_file in stew_files:
-            if stew_file.is_file():
+        self.manifest = Manifest(locale_dir)
+        with self.stage('discover') as record:
+            for stew_file in find_stew_files(self.locale_dir, save_cache=not read_only):
                 self.add_to_process_queue(stew_file)
+            record['files'] += len(self.stew_paths)
+
+
+    def stage(self, name):
+        return self.timings.stage(name, self.locale_dir)
+
+
+    def parse(self, stew_path):
+        with self.stage('parse') as record:
+            record['files'] += 1
+            return Stew(stew_path)
 
 
     def add_to_process_queue(self, filename):
@@ -31,31 +195,266 @@ class LocalePathProcessor:
         if not a_path.exists():
             self.warnings.append(f'File not found: {a_path}')
             return
-        self.strings_txt.append(Stew(a_path))
-
-
-    def process(self):
+        self.stew_paths.append(a_path)
+
+
+    # The .stew files are only parsed when something has to be generated, so
+    # that an up to date locale dir costs no more than hashing its inputs.
+    @cached_property
+    def strings_txt(self):
+        return [self.parse(stew_path) for stew_path in self.stew_paths]
+
+
+    def input_hashes(self):
+        return {
+            str(stew_path.relative_to(self.locale_dir)): hash_file(stew_path)
+            for stew_path in self.stew_paths
+        }
+
+
+    # The base languages change the placeholders signatures of the entries.
+    def options(self):
+        options = {
+            'generator': GENERATOR_VERSION,
+            'dedupe': self.dedupe,
+            'base_languages': self.base_langs,
+        }
+        if self.used_keys is not None:
+            # A change of the keys in use has to regenerate the catalogs.
+            used = json.dumps([sorted(self.used_keys), LOCALIZER['KEEP_KEYS']])
+            options['prune'] = hash_bytes(used.encode('utf-8'))
+        return options
+
+
+    def is_up_to_date(self):
+        if not self.manifest.inputs_unchanged(self.input_hashes()):
+            return False
+        if self.manifest.options != self.options():
+            return False
+        # A language whose LC_MESSAGES dir was created since needs a catalog.
+        if self.manifest.lang_dirs != self.lang_dirs():
+            return False
+        for lang in self.manifest.langs:
+            po_file = self.path_for_lang(lang) / 'django.po'
+            if not po_file.exists() or not po_file.with_suffix('.mo').exists():
+                return False
+        return True
+
+
+    def prepare(self, force=False):
+        if not self.locale_dir.is_dir() or not force and self.is_up_to_date():
+            return None
+
+        self.regenerated = True
         self.all_langs = set()
         for st in self.strings_txt:
             self.all_langs.update(st.all_langs)
 
         self.create_locale_folders()
 
-        self.write_po_files()
+        # Fed to no writers, only to check the keys and their placeholders.
+        index = KeyIndex()
+        exported = self.new_exported()
         for strings_txt in self.strings_txt:
-            strings_txt.write_formatted()
-        #     strings_txt.find_spaces_before_punctuation()
-        #     strings_txt.find_wrong_paceholders()
-        #
-        #     self.warnings.extend(strings_txt.warnings)
-        #
-        for warning in self.warnings:
-            print(f'WARNING: {warning}\n\n')
+            self.feed(strings_txt, {}, index, exported)
+            self.write_formatted(strings_txt)
+        self.warnings.extend(index.warnings())
+        self.raise_errors()
+        self.save_exported(exported)
+        return [lang for lang in sorted(self.all_langs) if self.path_for_lang(lang).exists()]
+
+
+    # Returns the digest of the catalog and its .po file if the .po or the .mo
+    # file actually changed on disk.
+    def build_language(self, lang, force=False):
+        writers = {lang: CatalogWriter(self.path_for_lang(lang), lang)}
+        index = KeyIndex()
+        with discarding_on_error(writers):
+            for stew_file in self.strings_txt:
+                self.feed(stew_file, writers, index)
+        changed = self.commit_catalog(writers[lang], force)
+        return self.lang_digests[lang], writers[lang].po_file if changed else None
+
+
+    # Generates the catalogs of all the languages in a single pass over the
+    # .stew files: each file is parsed, formatted and fanned out to the writers
+    # of every language before the next one is read, so only one parse tree is
+    # held at a time, and the messages of the .mo files are spooled. The key
+    # index keeps a digest of the translations of every key. Returns the .po
+    # files that changed on disk.
+    def build_languages(self, force=False):
+        writers = self.catalog_writers()
+        self.all_langs = set()
+        index = KeyIndex()
+        exported = self.new_exported()
+        with discarding_on_error(writers):
+            for stew_path in self.stew_paths:
+                stew_file = self.parse(stew_path)
+                self.all_langs.update(stew_file.all_langs)
+                self.feed(stew_file, writers, index, exported)
+                self.write_formatted(stew_file)
+            self.warnings.extend(index.warnings())
+            self.raise_errors()
+        self.save_exported(exported)
 
+        self.create_locale_folders()
 
-    def write_po_files(self):
-        for lang in self.all_langs:
-            self.write_one_po_file(lang)
+        po_files = []
+        for lang, writer in writers.items():
+            if lang not in self.all_langs:
+                writer.discard()
+            elif self.commit_catalog(writer, force):
+                po_files.append(writer.po_file)
+        return po_files
+
+
+    # The translations of the keys are only collected for the bundles and the
+    # shards if either of them is generated.
+    def new_exported(self):
+        return [] if LOCALIZER['EXPORT_DIR'] or LOCALIZER['SHARD_DIR'] else None
+
+
+    def save_exported(self, exported):
+        if exported is not None:
+            save_entries(self.locale_dir, self.input_hashes(), self.options(), exported)
+
+
+    # Every definition of a key, as (source, msgid, used, translations) where
+    # the translations are a string for a singular key and a list of forms for
+    # a plural one, by language. They are those collected by the last
+    # generation, and the .stew files are only parsed if it did not collect
+    # them for the current inputs.
+    @cached_property
+    def exported_entries(self):
+        inputs, options = self.input_hashes(), self.options()
+        exported = load_entries(self.locale_dir, inputs, options)
+        if exported is None:
+            exported = []
+            index = KeyIndex()
+            for stew_file in self.strings_txt:
+                self.feed(stew_file, {}, index, exported)
+            if self.locale_dir.is_dir():
+                save_entries(self.locale_dir, inputs, options, exported)
+        return exported
+
+
+    # The languages of the locale dir that have an LC_MESSAGES dir.
+    def lang_dirs(self):
+        return [
+            lang_dir.name for lang_dir in sorted(self.locale_dir.iterdir())
+            if (lang_dir / 'LC_MESSAGES').is_dir()
+        ]
+
+
+    def catalog_writers(self):
+        return {
+            lang: CatalogWriter(self.locale_dir / lang / 'LC_MESSAGES', lang, self.read_only)
+            for lang in self.lang_dirs()
+        }
+
+
+    # Renders the catalogs in memory, like build_languages, and returns the
+    # files that generating them would change: the .po and .mo files, and the
+    # .stew files that are not formatted. Ignores the manifest and writes
+    # nothing.
+    def check(self):
+        if not self.locale_dir.is_dir():
+            return []
+        writers = self.catalog_writers()
+        self.all_langs = set()
+        index = KeyIndex()
+        stale = []
+        for stew_path in self.stew_paths:
+            stew_file = self.parse(stew_path)
+            self.all_langs.update(stew_file.all_langs)
+            self.feed(stew_file, writers, index)
+            if not has_content(stew_path, self.formatted(stew_file)):
+                stale.append(stew_path)
+        self.warnings.extend(index.warnings())
+        self.raise_errors()
+
+        for lang, writer in writers.items():
+            if lang not in self.all_langs:
+                writer.discard()
+                continue
+            if not writer.po.is_unchanged():
+                stale.append(writer.po_file)
+            mo_file = writer.po_file.with_suffix('.mo')
+            if not has_content(mo_file, generate_mo(writer.read_messages())):
+                stale.append(mo_file)
+        return stale
+
+
+    # Nothing is written if any string would make str.format fail in
+    # translate().
+    def raise_errors(self):
+        if self.errors:
+            print_warnings(self.warnings)
+            raise PlaceholderError(self.errors)
+
+
+    def commit_catalog(self, writer, force=False):
+        digest = writer.po.digest()
+        self.lang_digests[writer.lang] = digest
+        mo_file = writer.po_file.with_suffix('.mo')
+        if (not force and self.manifest.lang_unchanged(writer.lang, digest)
+                and writer.po_file.exists() and mo_file.exists()):
+            writer.discard()
+            return False
+
+        with self.stage('po') as record:
+            changed = writer.po.commit()
+            if changed:
+                record['files'] += 1
+                record['bytes'] += writer.po.size
+        if changed or force or not mo_file.exists():
+            with self.stage('mo') as record:
+                mo = generate_mo(writer.read_messages())
+                if write_if_changed(mo_file, mo):
+                    changed = True
+                    record['files'] += 1
+                    record['bytes'] += len(mo)
+        else:
+            writer.spool.close()
+        return changed
+
+
+    # Like Stew.write_formatted, but leaves files that are already formatted
+    # alone, so that watchers of the .stew files do not see them change.
+    def write_formatted(self, strings_txt):
+        with self.stage('format') as record:
+            content = self.formatted(strings_txt)
+            if write_if_changed(strings_txt.strings_path, content):
+                record['files'] += 1
+                record['bytes'] += len(content)
+
+
+    def formatted(self, strings_txt):
+        return ''.join(f'{line}\n' for line in strings_txt.formatted()).encode('utf-8')
+
+
+    def save_manifest(self, lang_digests):
+        # Hashed after write_formatted, so that the next run sees the
+        # normalized files it has just produced as unchanged.
+        self.manifest.inputs = self.input_hashes()
+        self.manifest.options = self.options()
+        self.manifest.langs = lang_digests
+        self.manifest.lang_dirs = self.lang_dirs()
+        with self.stage('manifest') as record:
+            self.manifest.save()
+            record['files'] += 1
+
+
+    def process(self, force=False):
+        if not self.locale_dir.is_dir() or not force and self.is_up_to_date():
+            return []
+
+        self.regenerated = True
+        po_files = self.build_languages(force)
+        self.save_manifest(self.lang_digests)
+
+        print_warnings(self.warnings)
+        return po_files
 
 
     def write_comment_and_tag(self, str_txt, key):
@@ -73,40 +472,115 @@ class LocalePathProcessor:
         return key.strip('[]').replace('"', '\\"')
 
 
-    def generate_po_file(self, lang):
-        for stew_file in self.strings_txt:
-            yield f'\n### from {stew_file.strings_path.relative_to(settings.BASE_DIR)}\n\n'
-            for key in stew_file.keys_in_order:
-                translations = stew_file.terms.dct.get(key)
-                if key not in stew_file.terms.dct:
-                    yield f'# {key}\n'
-                    continue
-
-                yield from self.write_comment_and_tag(stew_file, key)
-
-                forms = translations.dct.get(lang)
-                if not forms:
-                    continue
-
-                yield f'msgid "{self.strip_key(key)}"\n'
-                if len(forms) == 1:
-                    yield f'msgstr "{forms[0]}"\n'
+    def file_header(self, stew_file):
+        stew_path = stew_file.strings_path
+        try:
+            stew_path = stew_path.relative_to(settings.BASE_DIR)
+        except ValueError:
+            pass
+        return f'\n### from {stew_path}\n\n'
+
+
+    # The placeholders the key is formatted with, written into the .po entries
+    # as a signature. They carry no python-brace-format flag: the msgid is the
+    # key, so msgfmt --check-format would reject the placeholders of the
+    # msgstr.
+    def key_placeholders(self, key, translations):
+        fields, errors, warnings = check_placeholders(key, {
+            lang: forms.dct.values()
+            for lang, forms in translations.dct.items() if forms and lang != 'comment'
+        }, self.base_langs)
+        self.errors.extend(errors)
+        self.warnings.extend(warnings)
+        return fields
+
+
+    def po_entry(self, key, forms, fields=()):
+        if fields:
+            yield f'#. placeholders: {format_placeholders(fields)}\n'
+        yield f'msgid "{self.strip_key(key)}"\n'
+        if len(forms) == 1:
+            yield f'msgstr "{forms[0]}"\n'
+        else:
+            yield f'msgid_plural "{self.strip_key(key)}"\n'
+            for i, form in forms.items():
+                form = form.replace('"', '\\"')
+                yield f'msgstr[{i}] "{form}"\n'
+        yield '\n'
+
+
+    def is_used(self, key):
+        if self.used_keys is None:
+            return True
+        msgid = unescape(key.strip('[]'))
+        return msgid in self.used_keys or any(
+            fnmatch(msgid, pattern) for pattern in LOCALIZER['KEEP_KEYS'])
+
+
+    def mo_message(self, key, forms):
+        msgid = unescape(key.strip('[]'))
+        if len(forms) == 1:
+            return msgid, unescape(forms[0])
+        return (f'{msgid}\0{msgid}',
+                '\0'.join(unescape(forms.dct[i]) for i in sorted(forms.dct)))
+
+
+    def exported_entry(self, key, source, translations):
+        messages = {}
+        for lang, forms in translations.dct.items():
+            if lang != 'comment' and forms:
+                msgid, msgstr = self.mo_message(key, forms)
+                messages[lang] = msgstr.split('\0') if '\0' in msgid else msgstr
+        return [str(source), unescape(key.strip('[]')), self.is_used(key), messages]
+
+
+    # Writes the entries of one parsed .stew file to the catalog writers of
+    # the given languages. The lines shared by all the languages are built
+    # once per key, and only the languages a key is translated into are
+    # visited, so the work is proportional to the number of translations.
+    # Every key is recorded in the index, and with dedupe only its first
+    # definition in the locale dir makes it into the catalogs. Keys that are
+    # not in use are left out when pruning.
+    def feed(self, stew_file, writers, index, exported=None):
+        with self.stage('render') as record:
+            record['files'] += 1
+            self.feed_entries(stew_file, writers, index, exported)
+
+
+    def feed_entries(self, stew_file, writers, index, exported=None):
+        header = self.file_header(stew_file) if writers else ''
+        for writer in writers.values():
+            writer.write(header)
+        source = stew_file.strings_path.relative_to(self.locale_dir)
+
+        for key in stew_file.keys_in_order:
+            translations = stew_file.terms.dct.get(key)
+            entries = {}
+            if translations is None:
+                common = f'# {key}\n'
+            else:
+                common = ''.join(self.write_comment_and_tag(stew_file, key))
+                fields = self.key_placeholders(key, translations)
+                if exported is not None:
+                    exported.append(self.exported_entry(key, source, translations))
+                is_first = index.add(key, source, {
+                    lang: tuple(forms.dct.items())
+                    for lang, forms in translations.dct.items() if forms})
+                if self.dedupe and not is_first:
+                    common += f'# duplicate, see {index.source(key)}\n'
+                elif not self.is_used(key):
+                    common += '# unused\n'
+                    self.pruned.setdefault(key, source)
                 else:
-                    yield f'msgid_plural "{self.strip_key(key)}"\n'
-                    for i, form in forms.items():
-                        form = form.replace('"', '\\"')
-                        yield f'msgstr[{i}] "{form}"\n'
-                yield '\n'
+                    for lang, forms in translations.dct.items():
+                        writer = writers.get(lang)
+                        if writer is None or not forms:
+                            continue
+                        entries[lang] = ''.join(self.po_entry(key, forms, fields))
+                        writer.add_message(*self.mo_message(key, forms))
 
-
-    def write_one_po_file(self, lang):
-        if not self.path_for_lang(lang).exists():
-            return
-
-        with open(self.path_for_lang(lang) / 'django.po', 'w') as outfile:
-            outfile.write(PoFileHeader.get_header_for_lang(lang))
-            for string in self.generate_po_file(lang):
-                outfile.write(string)
+            for lang, writer in writers.items():
+                writer.write(common + entries.get(lang, ''))
 
 
     def create_locale_folders(self):
@@ -130,26 +604,334 @@ headers added in the generated .po file and add them to this script.\n
 class Command(BaseCommand):
     help = 'Generate .po and .mo files from .stew files'
 
-    def __init__(self):
-        super().__init__(self)
-        self.locale_paths = list(map(Path, settings.LOCALE_PATHS))
-        app_configs = apps.get_app_configs()
-        base_dir = Path(settings.BASE_DIR)
-
-        for app_config in app_configs:
-            app_path = Path(app_config.path)
-            locale_dir = app_path / 'locale'
-            if app_path.parent == base_dir and locale_dir.exists:
-                self.locale_paths.append(locale_dir)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.locale_paths = find_locale_dirs()
+        self.dedupe = False
+        self.used_keys = None
+        # The keys left out of the catalogs, by locale dir.
+        self.pruned = {}
+        # The locale dirs whose .stew files were read again by the last run,
+        # even if none of their catalogs changed on disk.
+        self.regenerated = []
+        # The processors the bundles and the shards are read from, kept across
+        # the runs of --watch, by locale dir.
+        self.exporters = {}
+        self.timings = Timings()
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate every catalog, ignoring the manifests of the locale dirs.')
+        parser.add_argument(
+            '--jobs', type=int, default=1,
+            help='Number of worker processes generating the catalogs of every '
+                 'locale dir and language in parallel.')
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Keep running and regenerate the catalogs of a locale dir '
+                 'whenever one of its .stew files changes.')
+        parser.add_argument(
+            '--dedupe', action='store_true',
+            help='Leave out of the catalogs the keys already defined in another '
+                 '.stew file of the same locale dir.')
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Leave out of the catalogs the keys that no translate() call or '
+                 'tag of the apps and templates uses.')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Write nothing, and exit with an error if generating the catalogs '
+                 'would change any file.')
+        parser.add_argument(
+            '--timings', nargs='?', const='table', choices=['table', 'json'],
+            help='Print the time spent, the files and bytes written and the peak '
+                 'memory of every stage and locale dir, as a table or as JSON.')
+        parser.add_argument(
+            '--profile', metavar='FILE',
+            help='Profile the command with cProfile and dump the statistics to FILE. '
+                 'Only the main process is profiled.')
 
 
     def handle(self, *args, **kwargs):
+        self.verbosity = kwargs['verbosity']
+        self.dedupe = kwargs['dedupe']
+        if kwargs['profile']:
+            profiler = cProfile.Profile()
+            try:
+                profiler.runcall(self.run, kwargs)
+            finally:
+                profiler.dump_stats(kwargs['profile'])
+        else:
+            self.run(kwargs)
+        if kwargs['watch'] and not kwargs['check']:
+            self.watch()
+
+
+    def run(self, options):
+        jobs, force = options['jobs'], options['force']
+        try:
+            with self.timings.stage('total'):
+                if options['prune']:
+                    with self.timings.stage('usage'):
+                        self.used_keys = frozenset(
+                            find_used_keys(jobs, save_cache=not options['check']))
+                if options['check']:
+                    return self.check_catalogs(jobs)
+                try:
+                    changed = self.generate(jobs, force)
+                except PlaceholderError as error:
+                    raise CommandError(f'Placeholders do not match:\n{error}')
+                if changed or force:
+                    with self.timings.stage('check_keys'):
+                        print_warnings(self.check_keys())
+                with self.timings.stage('indexes') as record:
+                    record['files'] += len(self.update_catalog_indexes(changed, force))
+                with self.timings.stage('shards') as record:
+                    record['files'] += len(self.update_shards(force))
+                with self.timings.stage('export') as record:
+                    record['files'] += len(self.export(force))
+            self.report(changed)
+        finally:
+            if options['timings']:
+                self.report_timings(options['timings'])
+
+
+    def report_timings(self, output):
+        if output == 'json':
+            self.stdout.write(json.dumps(self.timings.as_list(), indent=2))
+        else:
+            for line in self.timings.format_table():
+                self.stdout.write(line)
+
+
+    def generate(self, jobs, force):
+        self.pruned = {}
+        self.regenerated = []
+        if jobs > 1:
+            return self.process_in_parallel(jobs, force)
+        changed = []
+        for locale_path in self.locale_paths:
+            processor = LocalePathProcessor(
+                locale_path, self.dedupe, self.used_keys, timings=self.timings)
+            changed.extend(processor.process(force=force))
+            self.add_regenerated(processor)
+        return changed
+
+
+    def add_regenerated(self, processor):
+        if processor.regenerated:
+            self.regenerated.append(processor.locale_dir)
+        self.add_pruned(processor.locale_dir, processor.pruned)
+
+
+    def add_pruned(self, locale_path, pruned):
+        if pruned:
+            self.pruned[locale_path] = pruned
+
+
+    def check_catalogs(self, jobs):
+        try:
+            if jobs > 1:
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    results = list(executor.map(
+                        check_locale_dir, self.locale_paths, repeat(self.dedupe),
+                        repeat(self.used_keys)))
+            else:
+                results = [
+                    check_locale_dir(locale_path, self.dedupe, self.used_keys)
+                    for locale_path in self.locale_paths
+                ]
+        except PlaceholderError as error:
+            raise CommandError(f'Placeholders do not match:\n{error}')
+
+        stale = []
+        for locale_stale, warnings, timings in results:
+            print_warnings(warnings)
+            stale.extend(locale_stale)
+            self.timings.merge(timings)
+        if stale:
+            for file_path in stale:
+                self.stderr.write(f'    {file_path}')
+            raise CommandError(
+                f'{len(stale)} file(s) out of date, run generate_localizations')
+        if self.verbosity > 0:
+            self.stdout.write('All the catalogs are up to date')
+
+
+    # The keys translated differently in several locale dirs, of which Django
+    # only uses the translations of the locale dir that comes first. Read from
+    # the .mo files, so the locale dirs do not have to be parsed again.
+    def check_keys(self):
+        index = KeyIndex()
         for locale_path in self.locale_paths:
-            LocalePathProcessor(locale_path).process()
-        call_command('compilemessages')
+            translations = {}
+            for mo_file in sorted(locale_path.glob('*/LC_MESSAGES/django.mo')):
+                lang = mo_file.parent.parent.name
+                for msgid, (is_plural, forms) in read_mo_entries(mo_file)[1].items():
+                    translations.setdefault(msgid, {})[lang] = (is_plural, tuple(forms))
+            for msgid, lang_entries in translations.items():
+                index.add(msgid, locale_path, lang_entries)
+        return index.warnings(duplicates=False)
+
+
+    def update_catalog_indexes(self, changed, force=False):
+        catalog_dir = LOCALIZER['MMAP_CATALOG_DIR']
+        if not catalog_dir:
+            return []
+        changed_langs = {po_file.parent.parent.name for po_file in changed}
+        return update_indexes(catalog_dir, self.locale_paths, changed_langs, force)
+
+
+    # Like the bundles, see export, the shards hold the languages without a
+    # catalog.
+    def update_shards(self, force=False):
+        shard_dir = LOCALIZER['SHARD_DIR']
+        if not shard_dir:
+            return []
+        if not (self.regenerated or force) and path.exists(path.join(shard_dir, SHARD_INDEX_NAME)):
+            return []
+        return write_shards(shard_dir, self.exported_processors())
+
+
+    # The bundles hold the languages of every .stew file, including those
+    # without an LC_MESSAGES dir and so without a catalog, so they are exported
+    # again whenever a .stew file was read again, not only when a catalog
+    # changed.
+    def export(self, force=False):
+        export_dir = LOCALIZER['EXPORT_DIR']
+        if not export_dir:
+            return []
+        if not (self.regenerated or force) and path.exists(path.join(export_dir, BUNDLES_NAME)):
+            return []
+        return export_bundles(export_dir, self.exported_processors())
+
+
+    # The processors of the bundles and the shards. Only those of the
+    # regenerated locale dirs are replaced, so the translations of the others
+    # are not read again.
+    def exported_processors(self):
+        for locale_path in self.locale_paths:
+            if locale_path in self.regenerated or locale_path not in self.exporters:
+                self.exporters[locale_path] = LocalePathProcessor(
+                    locale_path, self.dedupe, self.used_keys)
+        return [self.exporters[locale_path] for locale_path in self.locale_paths]
+
+
+    def report(self, changed):
+        if self.verbosity > 0:
+            self.stdout.write(f'{len(changed)} catalog(s) changed')
+            if self.used_keys is not None:
+                count = sum(map(len, self.pruned.values()))
+                self.stdout.write(f'{count} unused key(s) left out of the catalogs')
+        if self.verbosity > 1:
+            for po_file in changed:
+                self.stdout.write(f'    {po_file}')
+            for locale_path, pruned in self.pruned.items():
+                for key, source in pruned.items():
+                    self.stdout.write(f'    {key} in {locale_path / source}')
+
+
+    def watched_paths(self):
+        paths = set()
+        for locale_path in self.locale_paths:
+            paths.add(locale_path)
+            for stew_file in find_stew_files(locale_path):
+                stew_path = locale_path / stew_file
+                paths.update((stew_path, stew_path.parent))
+        return paths
+
+
+    # Translations are not reloaded here, as this process serves no requests:
+    # servers pick the new .mo files up through the file_changed signal of the
+    # autoreloader, see clear_cache_on_file_change.
+    def regenerate(self, changed_paths):
+        locale_paths = [
+            locale_path for locale_path in self.locale_paths
+            if any(locale_path == a_path or locale_path in a_path.parents
+                   for a_path in changed_paths)
+        ]
+        changed = []
+        self.pruned = {}
+        self.regenerated = []
+        for locale_path in locale_paths:
+            processor = LocalePathProcessor(locale_path, self.dedupe, self.used_keys)
+            changed.extend(processor.process())
+            self.add_regenerated(processor)
+        self.update_catalog_indexes(changed)
+        self.update_shards()
+        self.export()
+        return changed
+
+
+    def watch(self):
+        watcher = get_watcher()
+        self.stdout.write('Watching for changes in .stew files. Press CTRL-C to quit.')
+        try:
+            while True:
+                changed_paths = watcher.wait(self.watched_paths())
+                try:
+                    self.report(self.regenerate(changed_paths))
+                except PlaceholderError as error:
+                    self.stderr.write(f'Placeholders do not match:\n{error}')
+        except KeyboardInterrupt:
+            pass
+
+
+    def process_in_parallel(self, jobs, force):
+        changed = []
+        processors = [
+            LocalePathProcessor(locale_path, self.dedupe, self.used_keys, timings=self.timings)
+            for locale_path in self.locale_paths
+        ]
+        warnings = []
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            prepared = list(executor.map(
+                prepare_locale_dir, self.locale_paths, repeat(force), repeat(self.dedupe),
+                repeat(self.used_keys)))
+
+            futures = []
+            for processor, (langs, processor_warnings, pruned, timings) in zip(
+                    processors, prepared):
+                warnings.extend(processor_warnings)
+                self.timings.merge(timings)
+                if langs is None:
+                    continue
+                self.regenerated.append(processor.locale_dir)
+                self.add_pruned(processor.locale_dir, pruned)
+                futures.append((processor, {
+                    lang: executor.submit(
+                        build_language, processor.locale_dir, lang, force, self.dedupe,
+                        self.used_keys)
+                    for lang in langs
+                }))
+
+            # Results are collected in submission order, so the manifests and
+            # the warnings do not depend on which worker finishes first.
+            for processor, lang_futures in futures:
+                lang_digests = {}
+                for lang, future in lang_futures.items():
+                    lang_digests[lang], po_file, timings = future.result()
+                    self.timings.merge(timings)
+                    if po_file:
+                        changed.append(po_file)
+                processor.save_manifest(lang_digests)
+
+        print_warnings(warnings)
+        return changed
 
 
 class PoFileHeader:
+    # The msgstr of the header entry, which is what ends up in the .mo file.
+    @staticmethod
+    def get_metadata_for_lang(lang):
+        header = PoFileHeader.get_header_for_lang(lang)
+        _, _, msgstr = header.partition('\nmsgstr\n""\n')
+        return ''.join(
+            unescape(line[1:-1]) for line in msgstr.splitlines() if line.startswith('"'))
+
+
     @staticmethod
     def get_header_for_lang(lang):
         header = '''# AUTOMATICALLY GENERATED FROM STRINGS.TXT
@@ -181,22 +963,6 @@ msgstr
 "Content-Transfer-Encoding: 8bit\\n"
 \n'''.format(lang=lang)
 
-        # Plural forms headers for different languages.
-        header += {
-            'ru': '''"Plural-Forms: nplurals=4; plural=(n%10==1 && n%100!=11 ? 0 : n%10>=2 && n"
-"%10<=4 && (n%100<12 || n%100>14) ? 1 : n%10==0 || (n%10>=5 && n%10<=9) || (n"
-"%100>=11 && n%100<=14)? 2 : 3);\\n"
-\n''',
-            'pl': '''"Plural-Forms: nplurals=3; plural=(n==1 ? 0 : n%10>=2 && n%10<=4 && (n%100<10 "
-"|| n%100>=20) ? 1 : 2);\\n"\n''',
-
-            'es': '"Plural-Forms: nplurals=2; plural=(n != 1);\\n"\n',
-            'de': '"Plural-Forms: nplurals=2; plural=(n != 1);\\n"\n',
-            'it': '"Plural-Forms: nplurals=2; plural=(n != 1);\\n"\n',
-            'nl': '"Plural-Forms: nplurals=2; plural=(n != 1);\\n"\n',
-
-            'fr': '"Plural-Forms: nplurals=2; plural=(n > 1);\\n"\n',
-            'tr': '"Plural-Forms: nplurals=2; plural=(n > 1);\\n"\n',
-
-        }.get(lang, '"Plural-Forms: nplurals=2; plural=(n != 1);\\n"\n')
+        header += ''.join(
+            wrap_po_string(f'Plural-Forms: {plural_forms(lang)}\\n'))
         return header
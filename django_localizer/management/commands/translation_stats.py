@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_localizer.settings import LOCALIZER
+from django_localizer.stats import load_stats
+
+
+class Command(BaseCommand):
+    help = 'Report the translate() statistics written by the processes into LOCALIZER["STATS_DIR"]'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Number of hot keys and of missing translations to list.')
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Write the report as JSON.')
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Delete the statistics once reported.')
+
+
+    def handle(self, *args, **kwargs):
+        stats_dir = LOCALIZER['STATS_DIR']
+        if not stats_dir:
+            raise CommandError('LOCALIZER["STATS_DIR"] is not set')
+        report = load_stats(stats_dir)
+        top = kwargs['top']
+        if kwargs['json']:
+            self.stdout.write(json.dumps({
+                'processes': report['processes'],
+                'seconds': report['seconds'],
+                'calls': self.most_common(report['calls'], top),
+                'missing': self.most_common(report['missing'], top),
+            }, indent=2))
+        else:
+            self.write_report(report, top)
+        if kwargs['clear']:
+            for file_path in Path(stats_dir).glob('*.json'):
+                file_path.unlink()
+
+
+    @staticmethod
+    def most_common(counter, top):
+        return [[lang, key, round(count)] for (lang, key), count in counter.most_common(top)]
+
+
+    def write_report(self, report, top):
+        calls = report['calls']
+        seconds = report['seconds']
+        self.stdout.write(f'Statistics of {report["processes"]} process(es), estimated from samples')
+        self.stdout.write(f'{round(sum(calls.values()))} translate() call(s)')
+        self.stdout.write(f'{seconds["translate"]:.3f}s in translate()')
+        self.stdout.write(f'{seconds["template"]:.3f}s in the translate template tag')
+        for title, counter in (('Hot keys', calls), ('Missing translations', report['missing'])):
+            self.stdout.write(f'\n{title}:')
+            for lang, key, count in self.most_common(counter, top):
+                self.stdout.write(f'{count:>10}  {lang or "-":<8}{key}')
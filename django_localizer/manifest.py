@@ -0,0 +1,88 @@
+import hashlib
+import json
+
+MANIFEST_NAME = '.localizer_manifest.json'
+ENTRIES_NAME = '.localizer_entries.json'
+# The version of the format of the generated files. Bump it whenever they
+# change for the same inputs, so that upgrading rebuilds the catalogs.
+GENERATOR_VERSION = 1
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(file_path):
+    with open(file_path, 'rb') as infile:
+        return hash_bytes(infile.read())
+
+
+# Hashes of the .stew inputs and of the generated catalogs of one locale dir,
+# the languages that had an LC_MESSAGES dir and the options they were
+# generated with. A manifest written by another GENERATOR_VERSION is ignored,
+# so that a new format of the generated files triggers a full rebuild.
+class Manifest:
+    def __init__(self, locale_dir):
+        self.path = locale_dir / MANIFEST_NAME
+        self.inputs = {}
+        self.options = {}
+        self.langs = {}
+        self.lang_dirs = []
+        self._load()
+
+
+    def _load(self):
+        try:
+            with open(self.path) as infile:
+                data = json.load(infile)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != GENERATOR_VERSION:
+            return
+        self.inputs = data.get('inputs', {})
+        self.options = data.get('options', {})
+        self.langs = data.get('langs', {})
+        self.lang_dirs = data.get('lang_dirs', [])
+
+
+    def inputs_unchanged(self, inputs):
+        return bool(self.inputs) and self.inputs == inputs
+
+
+    def lang_unchanged(self, lang, digest):
+        return self.langs.get(lang) == digest
+
+
+    def save(self):
+        data = {
+            'version': GENERATOR_VERSION,
+            'inputs': self.inputs,
+            'options': self.options,
+            'langs': self.langs,
+            'lang_dirs': self.lang_dirs,
+        }
+        with open(self.path, 'w') as outfile:
+            json.dump(data, outfile, indent=2, sort_keys=True)
+            outfile.write('\n')
+
+
+# The translations of one locale dir, in the order of its .stew files, for the
+# bundles and the shards, so that the locale dirs that are up to date are not
+# parsed again to export them. Like the manifest, they are only valid for the
+# inputs and the options they were collected from.
+def load_entries(locale_dir, inputs, options):
+    try:
+        with open(locale_dir / ENTRIES_NAME, encoding='utf-8') as infile:
+            data = json.load(infile)
+    except (OSError, ValueError):
+        return None
+    if (data.get('version'), data.get('inputs'), data.get('options')) != (
+            GENERATOR_VERSION, inputs, options):
+        return None
+    return data.get('entries')
+
+
+def save_entries(locale_dir, inputs, options, entries):
+    data = {'version': GENERATOR_VERSION, 'inputs': inputs, 'options': options, 'entries': entries}
+    with open(locale_dir / ENTRIES_NAME, 'w', encoding='utf-8') as outfile:
+        json.dump(data, outfile, ensure_ascii=False, separators=(',', ':'))
@@ -0,0 +1,104 @@
+import re
+import struct
+
+MAGIC = 0x950412de
+HEADER_SIZE = 7 * 4
+
+ESCAPE = re.compile(r'\\(.)')
+ESCAPES = {
+    'n': '\n',
+    't': '\t',
+    'r': '\r',
+    'a': '\a',
+    'b': '\b',
+    'f': '\f',
+    'v': '\v',
+    '\\': '\\',
+    '"': '"',
+}
+
+
+def unescape(string):
+    return ESCAPE.sub(lambda match: ESCAPES.get(match.group(1), match.group(0)), string)
+
+
+# The hashpjw function used by GNU gettext for the hash table of .mo files,
+# with the overflow behaviour of a 64 bit unsigned long.
+def hash_string(string):
+    hval = 0
+    for byte in string:
+        if not byte:
+            break
+        hval = ((hval << 4) + byte) & 0xffffffffffffffff
+        g = hval & 0xf0000000
+        if g:
+            hval ^= g >> 24
+            hval ^= g
+    return hval
+
+
+def is_prime(number):
+    if number < 2:
+        return False
+    divisor = 2
+    while divisor * divisor <= number:
+        if number % divisor == 0:
+            return False
+        divisor += 1
+    return True
+
+
+def next_prime(number):
+    while not is_prime(number):
+        number += 1
+    return number
+
+
+def hash_table(msgids):
+    size = max(3, next_prime(len(msgids) * 4 // 3))
+    table = [0] * size
+    for index, msgid in enumerate(msgids):
+        hval = hash_string(msgid)
+        slot = hval % size
+        incr = 1 + hval % (size - 2)
+        while table[slot]:
+            slot = (slot + incr) % size
+        table[slot] = index + 1
+    return table
+
+
+# Plural entries follow the gettext convention: the singular and the plural
+# msgid, as well as all the plural forms, are joined with NUL characters.
+def generate_mo(messages):
+    entries = sorted(
+        (msgid.encode('utf-8'), msgstr.encode('utf-8')) for msgid, msgstr in messages.items())
+    msgids = [msgid for msgid, _ in entries]
+    table = hash_table(msgids)
+
+    count = len(entries)
+    originals_offset = HEADER_SIZE
+    translations_offset = originals_offset + count * 8
+    hash_offset = translations_offset + count * 8
+    strings_offset = hash_offset + len(table) * 4
+
+    originals = []
+    translations = []
+    strings = []
+    offset = strings_offset
+    for column, descriptors in ((0, originals), (1, translations)):
+        for entry in entries:
+            string = entry[column]
+            descriptors.append((len(string), offset))
+            strings.append(string + b'\0')
+            offset += len(string) + 1
+
+    output = [
+        struct.pack(
+            '<7I', MAGIC, 0, count, originals_offset, translations_offset,
+            len(table), hash_offset),
+    ]
+    output.extend(struct.pack('<2I', *descriptor) for descriptor in originals)
+    output.extend(struct.pack('<2I', *descriptor) for descriptor in translations)
+    output.append(struct.pack(f'<{len(table)}I', *table))
+    output.extend(strings)
+    return b''.join(output)
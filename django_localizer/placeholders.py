@@ -0,0 +1,89 @@
+import re
+from string import Formatter
+
+from django.conf import settings
+from django.utils.translation import to_locale
+
+from django_localizer.settings import LOCALIZER
+
+FIELD_NAME = re.compile(r'[.\[]')
+
+_formatter = Formatter()
+
+
+class PlaceholderError(ValueError):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+    def __str__(self):
+        return '\n'.join(self.errors)
+
+
+# The names of the fields str.format fills in a string, with the automatically
+# numbered ones turned into their positions. Raises ValueError for strings
+# str.format would reject.
+def placeholders(string):
+    names = set()
+    position = 0
+    numbering = set()
+    for _, field_name, format_spec, _ in _formatter.parse(string):
+        if field_name is None:
+            continue
+        name = FIELD_NAME.split(field_name, 1)[0]
+        if name:
+            numbering.add('manual' if name.isdigit() else 'named')
+        else:
+            numbering.add('automatic')
+            name = str(position)
+            position += 1
+        names.add(name)
+        if format_spec:
+            names.update(placeholders(format_spec))
+    if {'automatic', 'manual'} <= numbering:
+        raise ValueError('cannot switch between automatic and manual field numbering')
+    return names
+
+
+def base_languages():
+    if LOCALIZER['BASE_LANGUAGE']:
+        return [LOCALIZER['BASE_LANGUAGE']]
+    return [to_locale(settings.LANGUAGE_CODE), settings.LANGUAGE_CODE.split('-')[0]]
+
+
+# Checks the placeholders of all the forms of a key in every language against
+# those of the base language. Placeholders missing from the base language make
+# str.format fail and are errors, placeholders left out of a translation are
+# only worth a warning. Returns the placeholders of the key, its errors and
+# its warnings.
+def check_placeholders(key, translations, base_langs):
+    errors = []
+    fields = {}
+    for lang, forms in translations.items():
+        fields[lang] = set()
+        for form in forms:
+            try:
+                fields[lang].update(placeholders(form))
+            except ValueError as error:
+                errors.append(f'{key} ({lang}): {error} in "{form}"')
+
+    base_lang = next((lang for lang in base_langs if lang in fields), None)
+    if base_lang is None:
+        return sorted(set().union(*fields.values())), errors, []
+    warnings = []
+    base = fields[base_lang]
+    for lang, lang_fields in fields.items():
+        if lang_fields - base:
+            errors.append(
+                f'{key} ({lang}): {format_placeholders(lang_fields - base)} '
+                f'not in the {base_lang} translation')
+        elif base - lang_fields:
+            warnings.append(
+                f'{key} ({lang}): {format_placeholders(base - lang_fields)} '
+                f'of the {base_lang} translation not used')
+    return sorted(base), errors, warnings
+
+
+def format_placeholders(names):
+    return ', '.join(f'{{{name}}}' for name in sorted(names))
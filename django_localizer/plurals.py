@@ -0,0 +1,205 @@
+import gettext
+from collections import namedtuple
+from functools import lru_cache
+
+PluralRule = namedtuple('PluralRule', ['nplurals', 'expression', 'func'])
+
+
+def _russian(n):
+    if n % 10 == 1 and n % 100 != 11:
+        return 0
+    if 2 <= n % 10 <= 4 and (n % 100 < 12 or n % 100 > 14):
+        return 1
+    if n % 10 == 0 or 5 <= n % 10 <= 9 or 11 <= n % 100 <= 14:
+        return 2
+    return 3
+
+
+def _east_slavic(n):
+    if n % 10 == 1 and n % 100 != 11:
+        return 0
+    if 2 <= n % 10 <= 4 and (n % 100 < 10 or n % 100 >= 20):
+        return 1
+    return 2
+
+
+def _polish(n):
+    if n == 1:
+        return 0
+    if 2 <= n % 10 <= 4 and (n % 100 < 10 or n % 100 >= 20):
+        return 1
+    return 2
+
+
+def _lithuanian(n):
+    if n % 10 == 1 and n % 100 != 11:
+        return 0
+    if n % 10 >= 2 and (n % 100 < 10 or n % 100 >= 20):
+        return 1
+    return 2
+
+
+def _latvian(n):
+    if n % 10 == 1 and n % 100 != 11:
+        return 0
+    return 1 if n != 0 else 2
+
+
+def _romanian(n):
+    if n == 1:
+        return 0
+    return 1 if n == 0 or 0 < n % 100 < 20 else 2
+
+
+def _slovenian(n):
+    if n % 100 == 1:
+        return 0
+    if n % 100 == 2:
+        return 1
+    return 2 if n % 100 in (3, 4) else 3
+
+
+def _arabic(n):
+    if n <= 2:
+        return n
+    if 3 <= n % 100 <= 10:
+        return 3
+    return 4 if n % 100 >= 11 else 5
+
+
+def _irish(n):
+    if n == 1:
+        return 0
+    if n == 2:
+        return 1
+    if n < 7:
+        return 2
+    return 3 if n < 11 else 4
+
+
+def _welsh(n):
+    if n == 1:
+        return 0
+    if n == 2:
+        return 1
+    return 2 if n != 8 and n != 11 else 3
+
+
+def _maltese(n):
+    if n == 1:
+        return 0
+    if n == 0 or 1 < n % 100 < 11:
+        return 1
+    return 2 if 10 < n % 100 < 20 else 3
+
+
+def _scottish_gaelic(n):
+    if n in (1, 11):
+        return 0
+    if n in (2, 12):
+        return 1
+    return 2 if 2 < n < 20 else 3
+
+
+# The plural rules of the CLDR languages, as the gettext expressions written
+# into the Plural-Forms headers and as the equivalent Python functions used
+# to pick the plural form at runtime.
+RULES = {
+    'none': PluralRule(1, '0', lambda n: 0),
+    'one': PluralRule(2, '(n != 1)', lambda n: int(n != 1)),
+    'zero_one': PluralRule(2, '(n > 1)', lambda n: int(n > 1)),
+    'russian': PluralRule(
+        4, '(n%10==1 && n%100!=11 ? 0 : n%10>=2 && n%10<=4 && (n%100<12 || n%100>14) ? 1 : '
+           'n%10==0 || (n%10>=5 && n%10<=9) || (n%100>=11 && n%100<=14) ? 2 : 3)',
+        _russian),
+    'east_slavic': PluralRule(
+        3, '(n%10==1 && n%100!=11 ? 0 : n%10>=2 && n%10<=4 && (n%100<10 || n%100>=20) ? 1 : 2)',
+        _east_slavic),
+    'polish': PluralRule(
+        3, '(n==1 ? 0 : n%10>=2 && n%10<=4 && (n%100<10 || n%100>=20) ? 1 : 2)', _polish),
+    'czech': PluralRule(
+        3, '(n==1 ? 0 : n>=2 && n<=4 ? 1 : 2)', lambda n: 0 if n == 1 else 1 if 2 <= n <= 4 else 2),
+    'lithuanian': PluralRule(
+        3, '(n%10==1 && n%100!=11 ? 0 : n%10>=2 && (n%100<10 || n%100>=20) ? 1 : 2)', _lithuanian),
+    'latvian': PluralRule(3, '(n%10==1 && n%100!=11 ? 0 : n != 0 ? 1 : 2)', _latvian),
+    'romanian': PluralRule(3, '(n==1 ? 0 : (n==0 || (n%100>0 && n%100<20)) ? 1 : 2)', _romanian),
+    'slovenian': PluralRule(
+        4, '(n%100==1 ? 0 : n%100==2 ? 1 : n%100==3 || n%100==4 ? 2 : 3)', _slovenian),
+    'arabic': PluralRule(
+        6, '(n==0 ? 0 : n==1 ? 1 : n==2 ? 2 : n%100>=3 && n%100<=10 ? 3 : n%100>=11 ? 4 : 5)',
+        _arabic),
+    'irish': PluralRule(5, '(n==1 ? 0 : n==2 ? 1 : n<7 ? 2 : n<11 ? 3 : 4)', _irish),
+    'welsh': PluralRule(4, '(n==1 ? 0 : n==2 ? 1 : n != 8 && n != 11 ? 2 : 3)', _welsh),
+    'macedonian': PluralRule(
+        2, '(n%10==1 && n%100!=11 ? 0 : 1)', lambda n: 0 if n % 10 == 1 and n % 100 != 11 else 1),
+    'icelandic': PluralRule(
+        2, '(n%10!=1 || n%100==11)', lambda n: int(n % 10 != 1 or n % 100 == 11)),
+    'maltese': PluralRule(
+        4, '(n==1 ? 0 : n==0 || (n%100>1 && n%100<11) ? 1 : n%100>10 && n%100<20 ? 2 : 3)',
+        _maltese),
+    'scottish_gaelic': PluralRule(
+        4, '(n==1 || n==11 ? 0 : n==2 || n==12 ? 1 : n>2 && n<20 ? 2 : 3)', _scottish_gaelic),
+}
+
+LANGUAGES = {
+    'none': [
+        'bo', 'dz', 'id', 'ig', 'ii', 'ja', 'jv', 'kea', 'km', 'ko', 'lo', 'ms', 'my', 'ses',
+        'sg', 'su', 'th', 'to', 'vi', 'wo', 'yo', 'yue', 'zh',
+    ],
+    'one': [
+        'af', 'an', 'ast', 'az', 'bg', 'ca', 'da', 'de', 'el', 'en', 'eo', 'es', 'et', 'eu',
+        'fi', 'fo', 'fur', 'fy', 'gl', 'gu', 'ha', 'he', 'hu', 'ia', 'io', 'it', 'ka', 'kk',
+        'ky', 'lb', 'ml', 'mn', 'mr', 'nb', 'ne', 'nl', 'nn', 'no', 'or', 'pa', 'ps', 'pt',
+        'rm', 'sd', 'so', 'sq', 'sv', 'sw', 'ta', 'te', 'tk', 'ug', 'ur', 'uz', 'xh', 'zu',
+    ],
+    'zero_one': [
+        'ak', 'am', 'bn', 'fa', 'fil', 'fr', 'hi', 'hy', 'kn', 'ln', 'mg', 'nso', 'oc',
+        'pt_br', 'si', 'ti', 'tr', 'wa',
+    ],
+    'russian': ['ru'],
+    'east_slavic': ['be', 'bs', 'hr', 'sh', 'sr', 'uk'],
+    'polish': ['pl'],
+    'czech': ['cs', 'sk'],
+    'lithuanian': ['lt'],
+    'latvian': ['lv'],
+    'romanian': ['mo', 'ro'],
+    'slovenian': ['sl'],
+    'arabic': ['ar'],
+    'irish': ['ga'],
+    'welsh': ['cy'],
+    'macedonian': ['mk'],
+    'icelandic': ['is'],
+    'maltese': ['mt'],
+    'scottish_gaelic': ['gd'],
+}
+
+RULE_BY_LANGUAGE = {
+    lang: RULES[name] for name, langs in LANGUAGES.items() for lang in langs
+}
+
+_FUNC_BY_EXPRESSION = {
+    rule.expression.replace(' ', ''): rule.func for rule in RULES.values()
+}
+
+
+# Accepts both language codes (pt-br) and locale names (pt_BR), and falls
+# back to the rule of the language without the country, then to English.
+@lru_cache(maxsize=None)
+def get_plural_rule(lang):
+    code = lang.replace('-', '_').lower()
+    rule = RULE_BY_LANGUAGE.get(code) or RULE_BY_LANGUAGE.get(code.partition('_')[0])
+    return rule or RULES['one']
+
+
+def plural_forms(lang):
+    rule = get_plural_rule(lang)
+    return f'nplurals={rule.nplurals}; plural={rule.expression};'
+
+
+# Returns the Python function of a known rule, and has gettext compile any
+# other expression.
+def compile_plural(expression):
+    func = _FUNC_BY_EXPRESSION.get(expression.replace(' ', ''))
+    if func is None:
+        return gettext.c2py(expression)
+    return func
@@ -1,14 +1,57 @@
 from django.conf import settings
 
 
-try:
-    LOCALIZER = settings.LOCALIZER
-except:
-    LOCALIZER = {}
-
-
-LOCALIZER.update(
-
-)
+LOCALIZER = {
+    # Patterns of the .stew files to process and of the files and directories
+    # to skip inside the locale dirs. A pattern matches either the name of an
+    # entry or its path relative to the locale dir.
+    'INCLUDE': ['*.stew'],
+    'EXCLUDE': ['.*', '__pycache__', 'node_modules', 'LC_MESSAGES'],
+    # Reuse the list of .stew files found in a locale dir for as long as none
+    # of its directories changed.
+    'DISCOVERY_CACHE': True,
+    # Number of (language, key, plural form) entries kept by translate().
+    'TRANSLATE_CACHE_SIZE': 4096,
+    # Directory where generate_localizations writes one memory-mapped index
+    # per language, merged from all the locale dirs, for translate() to look
+    # the keys up in. None keeps translate() on Django's gettext catalogs.
+    'MMAP_CATALOG_DIR': None,
+    # Directory where generate_localizations writes the catalogs split into
+    # one memory-mapped shard per .stew file and language, and the index of
+    # the shard of every key. translate() then only opens the shards of the
+    # keys it is asked for. MMAP_CATALOG_DIR takes precedence.
+    'SHARD_DIR': None,
+    # Languages whose catalogs are loaded when the app starts, or True for all
+    # the LANGUAGES, and the keys whose translations are cached in each of
+    # them. A key can also be given as a (key, n) tuple for a plural form.
+    'PRELOAD_LANGUAGES': [],
+    'PRELOAD_KEYS': [],
+    # Share of the translate() calls recorded by the instrumentation, 0
+    # disables it. Every process writes its statistics into STATS_DIR, if
+    # set, at exit and after every STATS_FLUSH_EVERY recorded calls.
+    'STATS_SAMPLE_RATE': 0,
+    'STATS_DIR': None,
+    'STATS_FLUSH_EVERY': 10000,
+    # Directory where generate_localizations writes the JSON bundles of the
+    # strings for the clients, None disables the export. Bundles served under
+    # their unhashed URL are cached by the clients for EXPORT_MAX_AGE seconds.
+    'EXPORT_DIR': None,
+    'EXPORT_MAX_AGE': 300,
+    # Language whose placeholders the translations are checked against, the
+    # language of LANGUAGE_CODE by default.
+    'BASE_LANGUAGE': None,
+    # Patterns of the files of the apps and template directories scanned for
+    # the keys in use by generate_localizations --prune, and whether to reuse
+    # the keys found in the files whose mtime did not change. Keys matching
+    # one of the KEEP_KEYS patterns, e.g. those built at runtime, are never
+    # pruned.
+    'USAGE_INCLUDE': ['*.py', '*.html', '*.txt', '*.jinja', '*.jinja2'],
+    'USAGE_CACHE': True,
+    'KEEP_KEYS': [],
+}
 
 
+try:
+    LOCALIZER.update(settings.LOCALIZER)
+except:
+    pass
@@ -0,0 +1,137 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.translation import to_locale
+
+from django_localizer.catalog import MmapCatalog, generate_index
+from django_localizer.files import write_if_changed
+from django_localizer.plurals import get_plural_rule
+
+SHARD_INDEX_NAME = 'shards.idx'
+SHARD_SUFFIX = '.idx'
+
+
+# Shards are named after their .stew file, e.g. blog.locale.strings for
+# blog/locale/strings.stew.
+def shard_name(stew_path):
+    stew_path = Path(stew_path)
+    try:
+        rel_path = stew_path.relative_to(settings.BASE_DIR)
+    except ValueError:
+        rel_path = stew_path.relative_to(stew_path.anchor)
+    return '.'.join(rel_path.with_suffix('').parts)
+
+
+def shard_path(shard_dir, lang, name):
+    return os.path.join(shard_dir, lang, name + SHARD_SUFFIX)
+
+
+# The shard of every key, and the entries of every shard by language. Like the
+# catalogs, the first definition of a key wins, and it is only written into
+# the shard of the .stew file defining it first.
+def collect_shards(processors):
+    owners = {}
+    shards = {}
+    for processor in processors:
+        for source, msgid, used, translations in processor.exported_entries:
+            if not used:
+                continue
+            name = shard_name(processor.locale_dir / source)
+            if owners.setdefault(msgid, name) != name:
+                continue
+            shard = shards.setdefault(name, {})
+            for lang, msgstr in translations.items():
+                is_plural = isinstance(msgstr, list)
+                shard.setdefault(lang, {}).setdefault(
+                    msgid, (is_plural, msgstr if is_plural else [msgstr]))
+    return owners, shards
+
+
+# Writes one index per .stew file and language, and the index of the shards
+# of the keys, which is shared by all the languages. Shards that are no longer
+# generated are removed. Returns the shards that changed.
+def write_shards(shard_dir, processors):
+    os.makedirs(shard_dir, exist_ok=True)
+    owners, shards = collect_shards(processors)
+    written = set()
+    changed = []
+    for name, langs in sorted(shards.items()):
+        for lang, entries in sorted(langs.items()):
+            file_path = shard_path(shard_dir, lang, name)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            data = generate_index(get_plural_rule(lang).expression, entries)
+            if write_if_changed(file_path, data):
+                changed.append(file_path)
+            written.add(Path(file_path))
+
+    for lang_dir in Path(shard_dir).iterdir():
+        if lang_dir.is_dir():
+            for file_path in lang_dir.glob('*' + SHARD_SUFFIX):
+                if file_path not in written:
+                    file_path.unlink()
+
+    index = generate_index('n != 1', {key: (False, [name]) for key, name in owners.items()})
+    write_if_changed(os.path.join(shard_dir, SHARD_INDEX_NAME), index)
+    return changed
+
+
+# The catalog of one language, looked up like an MmapCatalog. The shard of a
+# key is found in the index of the shards, and opened when the first of its
+# keys is requested.
+class ShardedCatalog:
+    def __init__(self, shard_dir, lang_dir, index, plural):
+        self.shard_dir = shard_dir
+        self.lang_dir = lang_dir
+        self.index = index
+        self.plural = plural
+        self.shards = {}
+
+
+    def shard(self, name):
+        try:
+            return self.shards[name]
+        except KeyError:
+            pass
+        file_path = shard_path(self.shard_dir, self.lang_dir, name)
+        shard = self.shards[name] = MmapCatalog(file_path) if os.path.exists(file_path) else None
+        return shard
+
+
+    def get(self, key):
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        shard = self.shard(entry[1][0])
+        if shard is None:
+            return None
+        return shard.get(key)
+
+
+_indexes = {}
+_catalogs = {}
+
+
+def get_sharded_catalog(shard_dir, lang):
+    try:
+        return _catalogs[shard_dir, lang]
+    except KeyError:
+        pass
+    catalog = None
+    if shard_dir not in _indexes:
+        index_file = os.path.join(shard_dir, SHARD_INDEX_NAME)
+        _indexes[shard_dir] = MmapCatalog(index_file) if os.path.exists(index_file) else None
+    index = _indexes[shard_dir]
+    if index is not None:
+        for candidate in dict.fromkeys((to_locale(lang), lang, lang.split('-')[0])):
+            if os.path.isdir(os.path.join(shard_dir, candidate)):
+                plural = get_plural_rule(candidate).func
+                catalog = ShardedCatalog(shard_dir, candidate, index, plural)
+                break
+    _catalogs[shard_dir, lang] = catalog
+    return catalog
+
+
+def clear_sharded_catalogs():
+    _indexes.clear()
+    _catalogs.clear()
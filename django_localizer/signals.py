@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent with lang and key the first time translate() finds no translation of a
+# key in a language, i.e. gettext returns the key itself.
+translation_missing = Signal()
+
+# Sent with the statistics of translate() since the previous flush, as
+# returned by TranslationStats.as_dict(), whenever they are flushed.
+stats_flushed = Signal()
@@ -0,0 +1,107 @@
+import json
+import os
+import random
+import socket
+import time
+from collections import Counter
+from pathlib import Path
+
+from django_localizer.files import write_atomic
+from django_localizer.signals import stats_flushed
+
+
+# Counters of the translate() calls of one process since its last flush. Only
+# a sample_rate share of the calls is recorded, the reports scale the counts
+# back up.
+class TranslationStats:
+    def __init__(self, sample_rate=1.0, stats_dir=None, flush_every=10000):
+        self.sample_rate = sample_rate
+        self.stats_dir = stats_dir
+        self.flush_every = flush_every
+        # The start time tells apart the processes that got the same pid.
+        self.process = f'{socket.gethostname()}-{os.getpid()}-{int(time.time())}'
+        self.flushes = 0
+        self.calls = Counter()
+        self.missing = Counter()
+        self.seconds = Counter()
+        self.sampled = 0
+
+
+    def sample(self):
+        return random.random() < self.sample_rate
+
+
+    def record(self, lang, key, seconds, missing):
+        self.calls[lang, key] += 1
+        if missing:
+            self.missing[lang, key] += 1
+        self.seconds['translate'] += seconds
+        self.sampled += 1
+        if self.flush_every and self.sampled % self.flush_every == 0:
+            self.flush()
+
+
+    def add_time(self, source, seconds):
+        self.seconds[source] += seconds
+
+
+    def as_dict(self):
+        return {
+            'process': self.process,
+            'sample_rate': self.sample_rate,
+            'calls': [[lang, key, count] for (lang, key), count in self.calls.items()],
+            'missing': [[lang, key, count] for (lang, key), count in self.missing.items()],
+            'seconds': dict(self.seconds),
+        }
+
+
+    def file_path(self):
+        return Path(self.stats_dir) / f'{self.process}-{self.flushes}.json'
+
+
+    # Every flush writes the statistics since the previous one into a file of
+    # its own and starts counting again, so that the files deleted once
+    # reported are not written again with the totals of the process.
+    def flush(self):
+        if not (self.calls or self.seconds):
+            return
+        data = self.as_dict()
+        stats_flushed.send(sender=self.__class__, stats=data)
+        if self.stats_dir:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            self.flushes += 1
+            write_atomic(self.file_path(), json.dumps(data).encode('utf-8'))
+        self.clear()
+
+
+    def clear(self):
+        self.calls.clear()
+        self.missing.clear()
+        self.seconds.clear()
+        self.sampled = 0
+
+
+# Adds up the statistics flushed by all the processes into estimates of the
+# actual numbers of calls and of the time spent.
+def load_stats(stats_dir):
+    report = {
+        'processes': 0,
+        'calls': Counter(),
+        'missing': Counter(),
+        'seconds': Counter(),
+    }
+    processes = set()
+    for file_path in sorted(Path(stats_dir).glob('*.json')):
+        try:
+            data = json.loads(file_path.read_text())
+        except (OSError, ValueError):
+            continue
+        scale = 1 / data['sample_rate']
+        processes.add(data.get('process', file_path.stem))
+        for name in ('calls', 'missing'):
+            for lang, key, count in data[name]:
+                report[name][lang, key] += count * scale
+        for source, seconds in data['seconds'].items():
+            report['seconds'][source] += seconds * scale
+    report['processes'] = len(processes)
+    return report
@@ -1,8 +1,146 @@
+from time import perf_counter
+
 from django import template
+from django.template.base import Variable, token_kwargs
+from django.utils.html import conditional_escape
+from django.utils.translation import get_language
+
+from django_localizer.translate import (
+    cache_generation, get_stats, translate as tr, translate_many as tr_many)
 
 register = template.Library()
 
-@register.simple_tag
-def translate(key, *args, **kwargs):
-    from ..translate import translate as tr
-    return tr(key, *args, **kwargs)
+NOT_LITERAL = object()
+
+
+def literal_value(filter_expression):
+    if filter_expression.filters:
+        return NOT_LITERAL
+    var = filter_expression.var
+    if isinstance(var, Variable):
+        if var.lookups is None and not var.translate:
+            return var.literal
+        return NOT_LITERAL
+    return var
+
+
+class TranslateNode(template.Node):
+    def __init__(self, key, args, kwargs, target_var=None):
+        self.key = key
+        self.args = args
+        self.kwargs = kwargs
+        self.target_var = target_var
+
+        self.literal_key = literal_value(key)
+        self.literal_args = [literal_value(arg) for arg in args]
+        self.literal_kwargs = {name: literal_value(value) for name, value in kwargs.items()}
+        self.is_literal = NOT_LITERAL not in (
+            self.literal_key, *self.literal_args, *self.literal_kwargs.values())
+
+        # Results of a literal-only invocation, by language.
+        self.results = {}
+        self.generation = None
+
+
+    def render_literal(self):
+        generation = cache_generation()
+        if generation != self.generation:
+            self.results = {}
+            self.generation = generation
+        lang = get_language()
+        try:
+            return self.results[lang]
+        except KeyError:
+            output = tr(self.literal_key, *self.literal_args, **self.literal_kwargs)
+            self.results[lang] = output
+            return output
+
+
+    # While the instrumentation is on, literal invocations go through
+    # translate() every time, so that their calls are counted.
+    def render(self, context):
+        stats = get_stats()
+        if stats is None:
+            return self.render_output(context, self.is_literal)
+        if not stats.sample():
+            return self.render_output(context, False)
+        start = perf_counter()
+        output = self.render_output(context, False)
+        stats.add_time('template', perf_counter() - start)
+        return output
+
+
+    def render_output(self, context, use_results):
+        if use_results:
+            output = self.render_literal()
+        else:
+            key = self.literal_key
+            if key is NOT_LITERAL:
+                key = self.key.resolve(context)
+            args = [arg.resolve(context) for arg in self.args]
+            kwargs = {name: value.resolve(context) for name, value in self.kwargs.items()}
+            output = tr(key, *args, **kwargs)
+
+        if self.target_var is not None:
+            context[self.target_var] = output
+            return ''
+        if context.autoescape:
+            output = conditional_escape(output)
+        return output
+
+
+class TranslateManyNode(template.Node):
+    def __init__(self, keys, target_var):
+        self.keys = keys
+        self.target_var = target_var
+
+
+    def render(self, context):
+        keys = []
+        for key in self.keys:
+            key = key.resolve(context)
+            if isinstance(key, str):
+                keys.append(key)
+            else:
+                keys.extend(key)
+        context[self.target_var] = tr_many(keys)
+        return ''
+
+
+@register.tag
+def translate(parser, token):
+    bits = token.split_contents()
+    tag_name = bits.pop(0)
+    target_var = None
+    if len(bits) >= 2 and bits[-2] == 'as':
+        target_var = bits[-1]
+        bits = bits[:-2]
+    if not bits:
+        raise template.TemplateSyntaxError(
+            f"'{tag_name}' takes at least one argument (the translation key)")
+
+    key = parser.compile_filter(bits.pop(0))
+    args = []
+    kwargs = {}
+    for bit in bits:
+        kwarg = token_kwargs([bit], parser)
+        if kwarg:
+            kwargs.update(kwarg)
+        elif kwargs:
+            raise template.TemplateSyntaxError(
+                f"'{tag_name}' received some positional argument(s) after some "
+                f"keyword argument(s)")
+        else:
+            args.append(parser.compile_filter(bit))
+    return TranslateNode(key, args, kwargs, target_var)
+
+
+@register.tag
+def translate_many(parser, token):
+    bits = token.split_contents()
+    tag_name = bits.pop(0)
+    if len(bits) < 3 or bits[-2] != 'as':
+        raise template.TemplateSyntaxError(
+            f"'{tag_name}' expects one or more keys or lists of keys followed by 'as <var>'")
+    keys = [parser.compile_filter(bit) for bit in bits[:-2]]
+    return TranslateManyNode(keys, bits[-1])
@@ -0,0 +1,95 @@
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+COLUMNS = ('stage', 'locale dir', 'seconds', 'files', 'bytes', 'peak memory')
+
+
+# The peak resident memory of the process so far, in bytes, or None where the
+# resource module is not available.
+def peak_memory():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_bytes(size):
+    if size is None:
+        return '-'
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GiB'
+
+
+# Wall time, files and bytes written per stage of the generation and per
+# locale dir, together with the peak memory of the process at the end of the
+# stage. The records of the worker processes are merged into those of the
+# command, so their seconds add up to more than the wall time of a parallel
+# run.
+class Timings:
+    def __init__(self):
+        self.records = {}
+
+
+    def record(self, stage, locale_dir=None):
+        key = (stage, str(locale_dir) if locale_dir is not None else '')
+        try:
+            return self.records[key]
+        except KeyError:
+            record = self.records[key] = {
+                'seconds': 0.0, 'files': 0, 'bytes': 0, 'peak_memory': None}
+            return record
+
+
+    # Yields the record of the stage, for the caller to count the files and
+    # bytes written.
+    @contextmanager
+    def stage(self, stage, locale_dir=None):
+        record = self.record(stage, locale_dir)
+        start = perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] += perf_counter() - start
+            record['peak_memory'] = peak_memory()
+
+
+    def merge(self, other):
+        for (stage, locale_dir), other_record in other.records.items():
+            record = self.record(stage, locale_dir or None)
+            record['seconds'] += other_record['seconds']
+            record['files'] += other_record['files']
+            record['bytes'] += other_record['bytes']
+            if other_record['peak_memory'] is not None:
+                record['peak_memory'] = max(record['peak_memory'] or 0, other_record['peak_memory'])
+
+
+    def as_list(self):
+        return [
+            {'stage': stage, 'locale_dir': locale_dir or None, **record}
+            for (stage, locale_dir), record in self.records.items()
+        ]
+
+
+    def format_table(self):
+        rows = [COLUMNS]
+        for item in self.as_list():
+            rows.append((
+                item['stage'], item['locale_dir'] or '', f'{item["seconds"]:.4f}',
+                str(item['files']), format_bytes(item['bytes']), format_bytes(item['peak_memory']),
+            ))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(COLUMNS))]
+        return [
+            '  '.join(
+                cell.ljust(width) if i < 2 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))).rstrip()
+            for row in rows
+        ]
@@ -1,4 +1,112 @@
-from django.utils.translation import gettext, ngettext
+import atexit
+from collections import OrderedDict, namedtuple
+from functools import total_ordering
+from time import perf_counter
+
+from django.conf import settings
+from django.utils.functional import Promise
+from django.utils.translation import get_language, gettext, ngettext, override, trans_real
+
+from django_localizer.catalog import clear_catalogs, get_catalog
+from django_localizer.plurals import get_plural_rule
+from django_localizer.settings import LOCALIZER
+from django_localizer.shards import clear_sharded_catalogs, get_sharded_catalog
+from django_localizer.signals import translation_missing
+from django_localizer.stats import TranslationStats
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+# A bounded LRU mapping of (language, key, plural index) to the translated
+# string and the function that formats it.
+class TranslationCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Incremented on every clear, so that results derived from the
+        # cached translations elsewhere can tell they are stale.
+        self.generation = 0
+
+
+    def get(self, cache_key):
+        entry = self.entries.get(cache_key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self.entries.move_to_end(cache_key)
+        except KeyError:
+            pass
+        return entry
+
+
+    def set(self, cache_key, entry):
+        self.entries[cache_key] = entry
+        while len(self.entries) > self.maxsize:
+            try:
+                self.entries.popitem(last=False)
+            except KeyError:
+                break
+
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.generation += 1
+
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+
+_cache = TranslationCache(LOCALIZER['TRANSLATE_CACHE_SIZE'])
+
+
+def cache_info():
+    return _cache.info()
+
+
+def clear_cache():
+    _cache.clear()
+    clear_catalogs()
+    clear_sharded_catalogs()
+
+
+def cache_generation():
+    return _cache.generation
+
+
+_stats = None
+
+
+def enable_stats(sample_rate=1.0, stats_dir=None, flush_every=10000):
+    global _stats
+    _stats = TranslationStats(sample_rate, stats_dir, flush_every)
+    return _stats
+
+
+def disable_stats():
+    global _stats
+    _stats = None
+
+
+def get_stats():
+    return _stats
+
+
+@atexit.register
+def _flush_stats():
+    if _stats is not None:
+        _stats.flush()
+
+
+if LOCALIZER['STATS_SAMPLE_RATE']:
+    enable_stats(
+        LOCALIZER['STATS_SAMPLE_RATE'], LOCALIZER['STATS_DIR'], LOCALIZER['STATS_FLUSH_EVERY'])
 
 
 def _get_n(*args, **kwargs):
@@ -6,7 +114,7 @@ def _get_n(*args, **kwargs):
     if args:
         n = args[0]
     elif kwargs and len(kwargs) == 1:
-        n = list(kwargs.items())[0][1]
+        n = next(iter(kwargs.values()))
     elif kwargs and 'n' in kwargs:
         n = kwargs['n']
     if isinstance(n, int):
@@ -14,13 +122,312 @@ def _get_n(*args, **kwargs):
     return None
 
 
-def _get_str(key, n):
+def _get_str(key, n, translation=None):
+    if translation is None:
+        if n is None:
+            return gettext(key)
+        return ngettext(key, key, n)
     if n is None:
-        return gettext(key)
-    return ngettext(key, key, n)
+        return translation.gettext(key)
+    return translation.ngettext(key, key, n)
+
+
+def _get_catalog(lang):
+    if lang is None or not settings.USE_I18N:
+        return None
+    if LOCALIZER['MMAP_CATALOG_DIR']:
+        return get_catalog(LOCALIZER['MMAP_CATALOG_DIR'], lang)
+    if LOCALIZER['SHARD_DIR']:
+        return get_sharded_catalog(LOCALIZER['SHARD_DIR'], lang)
+    return None
+
+
+# Only serves the lookups gettext and ngettext would resolve from the same
+# entry, everything else falls back to them.
+def _get_catalog_str(catalog, key, index):
+    if catalog is None:
+        return None
+    entry = catalog.get(key)
+    if entry is None:
+        return None
+    is_plural, forms = entry
+    if index is None:
+        return None if is_plural else forms[0]
+    if not is_plural or index >= len(forms):
+        return None
+    return forms[index]
+
+
+def _default_plural(n):
+    return int(n != 1)
+
+
+def _get_plural(lang):
+    if lang is None or not settings.USE_I18N:
+        return _default_plural
+    catalog = _get_catalog(lang)
+    if catalog is not None:
+        return catalog.plural
+    return get_plural_rule(lang).func
+
+
+def _get_formatter(s):
+    # Strings without placeholders come out of str.format unchanged.
+    if '{' not in s and '}' not in s:
+        return lambda *args, **kwargs: s
+    return s.format
+
+
+def _lookup(lang, plural, key, n, translator=None):
+    index = None if n is None else (plural or _get_plural(lang))(n)
+    cache_key = (lang, key, index)
+    entry = _cache.get(cache_key)
+    if entry is None:
+        if translator is None:
+            s = _get_catalog_str(_get_catalog(lang), key, index)
+            if s is None:
+                s = _get_str(key, n)
+        else:
+            s = _get_catalog_str(translator.catalog, key, index)
+            if s is None:
+                s = _get_str(key, n, translator.translation)
+        # gettext has no other way of telling that a translation is missing.
+        missing = s == key
+        if missing:
+            translation_missing.send(sender=None, lang=lang, key=key)
+        entry = (s, _get_formatter(s), missing)
+        _cache.set(cache_key, entry)
+    return entry
+
+
+def _translate(lang, plural, key, args, kwargs, translator=None):
+    if _stats is not None and _stats.sample():
+        start = perf_counter()
+        entry = _lookup(lang, plural, key, _get_n(*args, **kwargs), translator)
+        output = entry[1](*args, **kwargs)
+        _stats.record(lang, key, perf_counter() - start, entry[2])
+        return output
+    return _lookup(lang, plural, key, _get_n(*args, **kwargs), translator)[1](*args, **kwargs)
+
+
+# The key, args and kwargs of an item of translate_many. Like in warm_up, an
+# args that is not a tuple or a list is the only argument, e.g. ('{} cars', 5).
+def _many_item(item):
+    if isinstance(item, str):
+        return item, (), {}
+    key, *rest = item
+    if len(rest) > 2 or len(rest) == 2 and not isinstance(rest[1], dict):
+        raise TypeError(
+            f'translate_many() items must be a key or a (key, args) or (key, args, kwargs) '
+            f'tuple, not {item!r}')
+    args = rest[0] if rest else ()
+    if not isinstance(args, (tuple, list)):
+        args = (args,)
+    return key, args, rest[1] if len(rest) == 2 else {}
+
+
+def _translate_many(lang, plural, keys, translator=None):
+    translations = {}
+    for item in keys:
+        key, args, kwargs = _many_item(item)
+        translations[key] = _translate(lang, plural, key, args, kwargs, translator)
+    return translations
 
 
 def translate(key, *args, **kwargs):
-    n = _get_n(*args, **kwargs)
-    s = _get_str(key, n)
-    return s.format(*args, **kwargs)
+    return _translate(get_language(), None, key, args, kwargs)
+
+
+# The result of translate_lazy: a Promise, like the results of Django's lazy(),
+# so that Django serializes and encodes it as a string. It is translated when
+# turned into a string and the result is kept for every language, until the
+# cache of translate() is cleared. Otherwise it behaves like its string: the
+# operators and the methods of str are applied to the translation.
+@total_ordering
+class LazyTranslation(Promise):
+    # Its own attributes, which are missing from copies until their state is
+    # restored.
+    _attributes = frozenset({'key', 'args', 'kwargs', 'results', 'generation'})
+
+    def __init__(self, key, args, kwargs):
+        self.key = key
+        self.args = args
+        self.kwargs = kwargs
+        self.results = {}
+        self.generation = None
+
+
+    def __str__(self):
+        if self.generation != _cache.generation:
+            self.results = {}
+            self.generation = _cache.generation
+        lang = get_language()
+        try:
+            return self.results[lang]
+        except KeyError:
+            output = self.results[lang] = _translate(lang, None, self.key, self.args, self.kwargs)
+            return output
+
+
+    # Only called for the attributes not found on the instance or the class,
+    # e.g. upper. The special names are left alone, so copy and pickle do not
+    # translate.
+    def __getattr__(self, name):
+        if name.startswith('__') or name in self._attributes:
+            raise AttributeError(name)
+        return getattr(str(self), name)
+
+
+    def __repr__(self):
+        return f'<LazyTranslation {self.key!r}>'
+
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+
+    def __eq__(self, other):
+        if isinstance(other, Promise):
+            other = str(other)
+        return str(self) == other
+
+
+    def __lt__(self, other):
+        if isinstance(other, Promise):
+            other = str(other)
+        return str(self) < other
+
+
+    def __hash__(self):
+        return hash(str(self))
+
+
+    def __len__(self):
+        return len(str(self))
+
+
+    def __getitem__(self, index):
+        return str(self)[index]
+
+
+    def __contains__(self, item):
+        if isinstance(item, Promise):
+            item = str(item)
+        return item in str(self)
+
+
+    def __iter__(self):
+        return iter(str(self))
+
+
+    def __add__(self, other):
+        return str(self) + str(other)
+
+
+    def __radd__(self, other):
+        return str(other) + str(self)
+
+
+    def __mod__(self, other):
+        return str(self) % other
+
+
+    def __mul__(self, count):
+        return str(self) * count
+
+
+    def __rmul__(self, count):
+        return count * str(self)
+
+
+def translate_lazy(key, *args, **kwargs):
+    return LazyTranslation(key, args, kwargs)
+
+
+# Each item of keys is either a key or a (key, args) or (key, args, kwargs)
+# tuple, where args can also be a single argument. The active language and its plural function are looked up once for
+# all of them.
+def translate_many(keys):
+    lang = get_language()
+    return _translate_many(lang, _get_plural(lang), keys)
+
+
+# Translates into one language regardless of the active one. The Django
+# translation object, the memory-mapped catalog and the plural function of the
+# language are resolved once, instead of through the thread-local active
+# language on every call, and again only after the cache of translate() is
+# cleared. A translator holds no per-request state, so the same one can be
+# shared by threads and kept in a ContextVar under ASGI.
+class Translator:
+    __slots__ = ('lang', 'translation', 'catalog', 'plural', 'generation')
+
+    def __init__(self, lang):
+        self.lang = lang
+        self.resolve()
+
+
+    def resolve(self):
+        self.generation = _cache.generation
+        if self.lang is None or not settings.USE_I18N:
+            self.translation = None
+        else:
+            self.translation = trans_real.translation(self.lang)
+        self.catalog = _get_catalog(self.lang)
+        self.plural = _get_plural(self.lang)
+
+
+    def translate(self, key, *args, **kwargs):
+        if self.generation != _cache.generation:
+            self.resolve()
+        return _translate(self.lang, self.plural, key, args, kwargs, self)
+
+
+    def translate_many(self, keys):
+        if self.generation != _cache.generation:
+            self.resolve()
+        return _translate_many(self.lang, self.plural, keys, self)
+
+
+    def __repr__(self):
+        return f'<Translator {self.lang!r}>'
+
+
+_translators = {}
+
+
+# Translators are shared, one per language. Without a language, the one of the
+# active language is returned.
+def get_translator(lang=None):
+    if lang is None:
+        lang = get_language()
+    try:
+        return _translators[lang]
+    except KeyError:
+        translator = _translators[lang] = Translator(lang)
+        return translator
+
+
+# Loads the catalogs of the languages and caches the translations of the keys
+# in each of them, so that the first requests after a start do not pay for it.
+# Each item of keys is either a key or a (key, n) tuple.
+def warm_up(langs, keys=()):
+    if langs is True:
+        langs = [lang for lang, _ in settings.LANGUAGES]
+    for lang in langs:
+        if settings.USE_I18N:
+            trans_real.translation(lang)
+        plural = _get_plural(lang)
+        with override(lang):
+            for item in keys:
+                key, n = (item, None) if isinstance(item, str) else item
+                _lookup(lang, plural, key, n)
+
+
+def clear_cache_on_file_change(sender, file_path, **kwargs):
+    if file_path.suffix == '.mo':
+        clear_cache()
+
+
+def clear_cache_on_setting_change(sender, setting, **kwargs):
+    if setting in {'LANGUAGES', 'LANGUAGE_CODE', 'LOCALE_PATHS', 'USE_I18N', 'LOCALIZER'}:
+        clear_cache()
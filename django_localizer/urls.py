@@ -0,0 +1,11 @@
+from django.urls import re_path
+
+from django_localizer import views
+
+app_name = 'django_localizer'
+
+urlpatterns = [
+    re_path(
+        r'^bundles/(?P<lang>[-_a-zA-Z]+)(?:\.(?P<digest>[0-9a-f]+))?\.json$',
+        views.bundle, name='bundle'),
+]
@@ -0,0 +1,173 @@
+import ast
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+from django_localizer.discovery import matches
+from django_localizer.settings import LOCALIZER
+
+CACHE_NAME = '.localizer_usage.json'
+
+# Functions whose first argument is a key, and the one taking a list of keys
+# or of (key, args, kwargs) tuples.
+KEY_FUNCTIONS = {'translate', 'translate_lazy'}
+MANY_FUNCTION = 'translate_many'
+
+STRING = r'''(?:"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')'''
+TEMPLATE_TAG = re.compile(r'{%-?\s*(translate(?:_many)?)\s+(.*?)-?%}', re.DOTALL)
+TEMPLATE_STRING = re.compile(STRING)
+CALL = re.compile(rf'\b(?:translate|translate_lazy)\(\s*({STRING})')
+
+
+def _literal(text):
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return None
+    return value if isinstance(value, str) else None
+
+
+# String literals are parsed as ast.Str before Python 3.8.
+def _string(node):
+    value = node.value if isinstance(node, ast.Constant) else getattr(node, 's', None)
+    return [value] if isinstance(value, str) else []
+
+
+# The keys of the calls with literal keys in Python source, including those
+# made through an alias, e.g. from django_localizer import translate as _.
+def python_keys(source):
+    tree = ast.parse(source)
+    key_functions = set(KEY_FUNCTIONS)
+    many_functions = {MANY_FUNCTION}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and (node.module or '').startswith('django_localizer'):
+            for alias in node.names:
+                if alias.name in KEY_FUNCTIONS:
+                    key_functions.add(alias.asname or alias.name)
+                elif alias.name == MANY_FUNCTION:
+                    many_functions.add(alias.asname or alias.name)
+
+    keys = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not node.args:
+            continue
+        if isinstance(node.func, ast.Name):
+            name = node.func.id
+        elif isinstance(node.func, ast.Attribute):
+            name = node.func.attr
+        else:
+            continue
+        if name in key_functions:
+            keys.update(_string(node.args[0]))
+        elif name in many_functions and isinstance(node.args[0], (ast.List, ast.Tuple, ast.Set)):
+            for item in node.args[0].elts:
+                if isinstance(item, ast.Tuple) and item.elts:
+                    item = item.elts[0]
+                keys.update(_string(item))
+    return keys
+
+
+# The keys of the translate and translate_many tags of Django and Jinja2
+# templates, and of the translate() calls of Jinja2 templates.
+def template_keys(source):
+    keys = set()
+    for tag, arguments in TEMPLATE_TAG.findall(source):
+        literals = TEMPLATE_STRING.finditer(arguments)
+        if tag == 'translate':
+            first = TEMPLATE_STRING.match(arguments)
+            literals = [first] if first else []
+        keys.update(filter(None, (_literal(match.group()) for match in literals)))
+    keys.update(filter(None, map(_literal, CALL.findall(source))))
+    return keys
+
+
+def scan_file(file_path):
+    with open(file_path, encoding='utf-8', errors='replace') as infile:
+        source = infile.read()
+    if file_path.endswith('.py'):
+        try:
+            return sorted(python_keys(source))
+        except (SyntaxError, ValueError):
+            pass
+    return sorted(template_keys(source))
+
+
+# The directories of the apps of the project, as in find_locale_dirs, and the
+# template directories.
+def source_dirs():
+    base_dir = Path(settings.BASE_DIR)
+    dirs = [
+        Path(app_config.path) for app_config in apps.get_app_configs()
+        if Path(app_config.path).parent == base_dir
+    ]
+    for engine in settings.TEMPLATES:
+        dirs.extend(map(Path, engine.get('DIRS', [])))
+    return dirs
+
+
+# The mtimes of the source files under the directories, by path.
+def find_source_files(dirs, include, exclude):
+    files = {}
+    pending = [str(directory) for directory in dirs if directory.is_dir()]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if matches(entry.name, entry.path, exclude):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file() and matches(entry.name, entry.path, include):
+                    files[entry.path] = entry.stat().st_mtime_ns
+    return files
+
+
+def load_usage(cache_path):
+    try:
+        with open(cache_path) as infile:
+            return json.load(infile)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_usage(cache_path, usage):
+    try:
+        with open(cache_path, 'w') as outfile:
+            json.dump(usage, outfile, indent=2, sort_keys=True)
+    except OSError:
+        pass
+
+
+# The keys used by the sources of the project. Only the files whose mtime
+# changed since the last scan are read again, by jobs worker processes.
+def find_used_keys(jobs=1, save_cache=True):
+    files = find_source_files(source_dirs(), LOCALIZER['USAGE_INCLUDE'], LOCALIZER['EXCLUDE'])
+    cache_path = Path(settings.BASE_DIR) / CACHE_NAME if LOCALIZER['USAGE_CACHE'] else None
+    cached = load_usage(cache_path) if cache_path else {}
+
+    usage = {}
+    stale = []
+    for file_path, mtime in sorted(files.items()):
+        entry = cached.get(file_path)
+        if entry and entry[0] == mtime:
+            usage[file_path] = entry
+        else:
+            stale.append(file_path)
+
+    if jobs > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(
+                scan_file, stale, chunksize=max(1, len(stale) // (jobs * 4))))
+    else:
+        results = list(map(scan_file, stale))
+    for file_path, keys in zip(stale, results):
+        usage[file_path] = [files[file_path], keys]
+
+    if cache_path and save_cache and usage != cached:
+        save_usage(cache_path, usage)
+    return {key for _, keys in usage.values() for key in keys}
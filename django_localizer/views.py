@@ -0,0 +1,70 @@
+import os
+from pathlib import Path
+
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+from django_localizer.export import BUNDLES_NAME, load_bundles
+from django_localizer.settings import LOCALIZER
+
+# Contents of the bundles served so far, by file name. A bundle never changes
+# under the same name, as the name contains the hash of its content.
+_bundles = {}
+
+# The bundles.json file last read from every export dir, together with the
+# stat of the file it was read from.
+_manifests = {}
+
+
+def _load_bundles(export_dir):
+    try:
+        stat = os.stat(Path(export_dir) / BUNDLES_NAME)
+    except OSError:
+        return {}
+    key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    cached = _manifests.get(export_dir)
+    if cached is None or cached[0] != key:
+        cached = _manifests[export_dir] = (key, load_bundles(export_dir))
+    return cached[1]
+
+
+def _current_bundle(lang):
+    export_dir = LOCALIZER['EXPORT_DIR']
+    if not export_dir:
+        raise Http404('LOCALIZER["EXPORT_DIR"] is not set')
+    name = _load_bundles(export_dir).get(lang)
+    if name is None:
+        raise Http404(f'No bundle for {lang}')
+    return name
+
+
+def _digest(name):
+    return name.split('.')[-2]
+
+
+# Serves the current bundle of a language. Under its hashed URL, the bundle
+# can be cached forever. Under the plain URL, it is cached for
+# LOCALIZER['EXPORT_MAX_AGE'] seconds and revalidated with its ETag. A hashed
+# URL that is no longer current is not found, even when revalidated.
+@require_safe
+def bundle(request, lang, digest=None):
+    name = _current_bundle(lang)
+    if digest is not None and _digest(name) != digest:
+        raise Http404(f'{lang}.{digest}.json is not the current bundle of {lang}')
+
+    etag = quote_etag(_digest(name))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            data = _bundles[name]
+        except KeyError:
+            data = _bundles[name] = (Path(LOCALIZER['EXPORT_DIR']) / name).read_bytes()
+        response = HttpResponse(data, content_type='application/json; charset=utf-8')
+    response['ETag'] = etag
+    if digest is None:
+        patch_cache_control(response, public=True, max_age=LOCALIZER['EXPORT_MAX_AGE'])
+    else:
+        patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    return response
@@ -0,0 +1,76 @@
+import os
+import time
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+class StatWatcher:
+    def __init__(self, interval=1):
+        self.interval = interval
+
+
+    def snapshot(self, paths):
+        mtimes = {}
+        for a_path in paths:
+            try:
+                mtimes[a_path] = os.stat(a_path).st_mtime_ns
+            except OSError:
+                mtimes[a_path] = None
+        return mtimes
+
+
+    # Blocks until one of the paths (.stew files or the directories that may
+    # receive new ones) changes and returns the changed paths.
+    def wait(self, paths):
+        before = self.snapshot(paths)
+        while True:
+            time.sleep(self.interval)
+            after = self.snapshot(paths)
+            changed = {a_path for a_path in paths if after[a_path] != before[a_path]}
+            if changed:
+                return changed
+
+
+class InotifyWatcher:
+    def __init__(self):
+        flags = inotify_simple.flags
+        self.mask = (flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM
+                     | flags.CREATE | flags.DELETE)
+        self.inotify = inotify_simple.INotify()
+        self.directories = {}
+
+
+    def watch_directory(self, directory):
+        if directory in self.directories.values():
+            return
+        try:
+            watch_descriptor = self.inotify.add_watch(str(directory), self.mask)
+        except OSError:
+            return
+        self.directories[watch_descriptor] = directory
+
+
+    def wait(self, paths):
+        for a_path in paths:
+            self.watch_directory(a_path if a_path.is_dir() else a_path.parent)
+
+        while True:
+            changed = set()
+            for event in self.inotify.read():
+                directory = self.directories.get(event.wd)
+                if directory is None or not event.name:
+                    continue
+                a_path = directory / event.name
+                if a_path in paths or a_path.suffix == '.stew':
+                    changed.add(a_path)
+            if changed:
+                return changed
+
+
+def get_watcher():
+    if inotify_simple is not None:
+        return InotifyWatcher()
+    return StatWatcher()
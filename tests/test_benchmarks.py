@@ -0,0 +1,29 @@
+import json
+from unittest import TestCase
+
+from benchmarks.run import BENCHMARKS, run_benchmarks
+
+PARAMS = {
+    'locale_dirs': 1,
+    'files_per_dir': 2,
+    'keys': 10,
+    'langs': 2,
+    'plural_forms': 2,
+    'plural_ratio': 0.5,
+    'repeat': 1,
+}
+
+
+class TestBenchmarks(TestCase):
+    def test_every_benchmark_runs_on_a_small_corpus(self):
+        report = run_benchmarks(PARAMS)
+        json.dumps(report)
+        self.assertEqual(report['params'], PARAMS)
+        self.assertIn('generate_cold', report['results'])
+        self.assertEqual(report['results']['translate_warm']['ops'], 20)
+
+
+    def test_selected_benchmarks(self):
+        report = run_benchmarks(PARAMS, names=['write_catalogs'])
+        self.assertEqual(sorted(report['results']), ['write_catalogs_per_language', 'write_catalogs_single_pass'])
+        self.assertIn('write_catalogs', [func.__name__ for func in BENCHMARKS])
@@ -0,0 +1,69 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.utils import translation
+
+from django_localizer.catalog import MmapCatalog, generate_index, index_path, update_indexes
+from django_localizer.settings import LOCALIZER
+from django_localizer.translate import _get_catalog, translate
+
+from tests.test_translate import LocalizedTestCase
+
+
+class TestMmapCatalog(LocalizedTestCase):
+    def test_lookup(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'ru.idx'
+            file_path.write_bytes(generate_index('n > 1', {
+                'greeting': (False, ['Привет']),
+                '{} cars': (True, ['{} машина', '{} машины']),
+            }))
+            catalog = MmapCatalog(file_path)
+            self.assertEqual(catalog.get('greeting'), (False, ['Привет']))
+            self.assertEqual(catalog.get('{} cars'), (True, ['{} машина', '{} машины']))
+            self.assertIsNone(catalog.get('farewell'))
+            self.assertEqual([catalog.plural(n) for n in (0, 1, 2)], [0, 0, 1])
+
+
+    def test_empty_index(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'ru.idx'
+            file_path.write_bytes(generate_index('n != 1', {}))
+            self.assertIsNone(MmapCatalog(file_path).get('greeting'))
+
+
+class TestMmapBackend(LocalizedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.catalog_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.catalog_dir.cleanup)
+        patcher = mock.patch.dict(LOCALIZER, {'MMAP_CATALOG_DIR': self.catalog_dir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def test_update_indexes(self):
+        self.assertEqual(update_indexes(self.catalog_dir.name, [self.locale_dir], set()), ['en', 'ru'])
+        self.assertEqual(update_indexes(self.catalog_dir.name, [self.locale_dir], set()), [])
+        # Rewriting identical content does not count as a change.
+        self.assertEqual(update_indexes(self.catalog_dir.name, [self.locale_dir], {'ru'}), [])
+        self.assertTrue(Path(index_path(self.catalog_dir.name, 'ru')).exists())
+
+
+    def test_translate_from_the_index(self):
+        update_indexes(self.catalog_dir.name, [self.locale_dir], set())
+        with translation.override('ru'):
+            self.assertIsNotNone(_get_catalog('ru'))
+            self.assertEqual(translate('greeting'), 'Привет')
+            self.assertEqual(translate('hello_name', name='Вася'), 'Привет, Вася')
+            self.assertEqual(translate('{} cars', 1), '1 машина')
+            self.assertEqual(translate('{} cars', 3), '3 машины')
+            self.assertEqual(translate('{} cars', 5), '5 машин')
+            self.assertEqual(translate('missing'), 'missing')
+
+
+    def test_falls_back_to_gettext_without_an_index(self):
+        with translation.override('ru'):
+            self.assertIsNone(_get_catalog('ru'))
+            self.assertEqual(translate('{} cars', 5), '5 машин')
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from django_localizer import discovery
+from django_localizer.discovery import find_stew_files, walk_stew_files
+from django_localizer.settings import LOCALIZER
+
+
+class TestDiscovery(TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.locale_dir = Path(tmp_dir.name)
+        for name in ('strings.stew', 'errors/errors.stew', 'node_modules/pkg/x.stew',
+                     '.git/y.stew', 'en/LC_MESSAGES/django.po', 'errors/readme.txt'):
+            (self.locale_dir / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.locale_dir / name).touch()
+
+
+    def test_excluded_directories_are_pruned(self):
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            stew_files, dir_mtimes = walk_stew_files(
+                self.locale_dir, LOCALIZER['INCLUDE'], LOCALIZER['EXCLUDE'])
+
+        self.assertEqual(stew_files, [os.path.join('errors', 'errors.stew'), 'strings.stew'])
+        self.assertEqual(sorted(dir_mtimes), ['', 'en', 'errors'])
+        self.assertEqual(scandir.call_count, 3)
+
+
+    def test_patterns_come_from_settings(self):
+        with mock.patch.dict(LOCALIZER, {'EXCLUDE': ['errors'], 'DISCOVERY_CACHE': False}):
+            self.assertEqual(
+                find_stew_files(self.locale_dir),
+                [os.path.join('.git', 'y.stew'), os.path.join('node_modules', 'pkg', 'x.stew'),
+                 'strings.stew'])
+
+
+    def test_cached_result_is_reused(self):
+        find_stew_files(self.locale_dir)
+        with mock.patch.object(discovery, 'walk_stew_files') as walk:
+            self.assertEqual(len(find_stew_files(self.locale_dir)), 2)
+        walk.assert_not_called()
+
+
+    def test_cache_is_invalidated_by_new_files(self):
+        find_stew_files(self.locale_dir)
+        (self.locale_dir / 'errors' / 'more.stew').touch()
+        os.utime(self.locale_dir / 'errors', ns=(0, 0))
+
+        self.assertIn(os.path.join('errors', 'more.stew'), find_stew_files(self.locale_dir))
@@ -0,0 +1,141 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from django_localizer.export import BUNDLES_NAME, load_bundles
+from django_localizer.management.commands import generate_localizations
+from django_localizer.manifest import ENTRIES_NAME
+from django_localizer.settings import LOCALIZER
+
+STEW = '''[greeting]
+    en = Hello
+    ru = Привет
+
+[{} cars]
+    en = {} car
+    en[1] = {} cars
+    ru = {} машина
+    ru[1] = {} машины
+    ru[2] = {} машин
+    ru[3] = {} машины
+'''
+
+
+@override_settings(ROOT_URLCONF='tests.urls', ALLOWED_HOSTS=['testserver'])
+class TestExport(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        base_dir = Path(tmp_dir.name)
+        self.locale_dir = base_dir / 'locale'
+        for lang in ('en', 'ru'):
+            (self.locale_dir / lang / 'LC_MESSAGES').mkdir(parents=True)
+        (self.locale_dir / 'strings.stew').write_text(STEW)
+        self.export_dir = base_dir / 'bundles'
+        settings_override = override_settings(
+            BASE_DIR=str(base_dir), LOCALE_PATHS=[str(self.locale_dir)])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        patcher = mock.patch.dict(LOCALIZER, {'EXPORT_DIR': str(self.export_dir)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        call_command('generate_localizations', verbosity=0)
+
+
+    def read_bundle(self, lang):
+        return json.loads((self.export_dir / load_bundles(self.export_dir)[lang]).read_text())
+
+
+    def test_bundles(self):
+        self.assertEqual(sorted(load_bundles(self.export_dir)), ['en', 'ru'])
+        bundle = self.read_bundle('ru')
+        self.assertEqual(bundle['nplurals'], 4)
+        self.assertEqual(bundle['messages'], {
+            'greeting': 'Привет',
+            '{} cars': ['{} машина', '{} машины', '{} машин', '{} машины'],
+        })
+
+
+    def test_changed_bundles_replace_the_previous_ones(self):
+        bundles = load_bundles(self.export_dir)
+        (self.locale_dir / 'strings.stew').write_text(STEW.replace('Привет', 'Здравствуйте'))
+        call_command('generate_localizations', verbosity=0)
+        new_bundles = load_bundles(self.export_dir)
+        self.assertEqual(new_bundles['en'], bundles['en'])
+        self.assertNotEqual(new_bundles['ru'], bundles['ru'])
+        self.assertEqual(
+            sorted(p.name for p in self.export_dir.iterdir()),
+            sorted([BUNDLES_NAME, *new_bundles.values()]))
+
+
+    def test_languages_without_catalogs_are_exported_again(self):
+        stew_path = self.locale_dir / 'strings.stew'
+        stew_path.write_text(STEW.replace('    ru = Привет\n', '    ru = Привет\n    fr = Bonjour\n'))
+        call_command('generate_localizations', verbosity=0)
+        self.assertEqual(self.read_bundle('fr')['messages']['greeting'], 'Bonjour')
+
+        stew_path.write_text(stew_path.read_text().replace('Bonjour', 'Salut'))
+        call_command('generate_localizations', verbosity=0)
+        self.assertEqual(self.read_bundle('fr')['messages']['greeting'], 'Salut')
+
+
+    def test_stew_files_are_parsed_once(self):
+        stew_path = self.locale_dir / 'strings.stew'
+        stew_path.write_text(stew_path.read_text().replace('Привет', 'Здравствуйте'))
+        with mock.patch.object(generate_localizations, 'Stew', wraps=generate_localizations.Stew) as stew:
+            call_command('generate_localizations', verbosity=0)
+        self.assertEqual(stew.call_count, 1)
+        self.assertEqual(self.read_bundle('ru')['messages']['greeting'], 'Здравствуйте')
+
+
+    def test_missing_entries_are_collected_again(self):
+        (self.locale_dir / ENTRIES_NAME).unlink()
+        (self.export_dir / BUNDLES_NAME).unlink()
+        call_command('generate_localizations', verbosity=0)
+        self.assertTrue((self.locale_dir / ENTRIES_NAME).exists())
+        self.assertEqual(self.read_bundle('ru')['messages']['greeting'], 'Привет')
+
+
+    def test_view(self):
+        response = self.client.get('/bundles/ru.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), self.read_bundle('ru'))
+        self.assertIn('max-age=300', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.client.get('/bundles/ru.json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        digest = load_bundles(self.export_dir)['ru'].split('.')[1]
+        response = self.client.get(f'/bundles/ru.{digest}.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get('/bundles/ru.0123456789ab.json').status_code, 404)
+        self.assertEqual(self.client.get('/bundles/de.json').status_code, 404)
+
+
+    def test_view_reads_the_bundles_once(self):
+        with mock.patch('django_localizer.views.load_bundles', wraps=load_bundles) as load:
+            for _ in range(2):
+                self.assertEqual(self.client.get('/bundles/ru.json').status_code, 200)
+            self.assertEqual(load.call_count, 1)
+            stew_path = self.locale_dir / 'strings.stew'
+            stew_path.write_text(stew_path.read_text().replace('Привет', 'Здравствуйте'))
+            call_command('generate_localizations', verbosity=0)
+            self.assertEqual(json.loads(self.client.get('/bundles/ru.json').content),
+                             self.read_bundle('ru'))
+            self.assertEqual(load.call_count, 2)
+
+
+    def test_stale_hashed_url_is_not_found_when_revalidated(self):
+        stale = load_bundles(self.export_dir)['ru'].split('.')[1]
+        stew_path = self.locale_dir / 'strings.stew'
+        stew_path.write_text(stew_path.read_text().replace('Привет', 'Здравствуйте'))
+        call_command('generate_localizations', verbosity=0)
+        etag = self.client.get('/bundles/ru.json')['ETag']
+        response = self.client.get(f'/bundles/ru.{stale}.json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,50 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from django_localizer.files import HashingWriter, write_atomic, write_if_changed
+
+
+class TestWriteIfChanged(TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = Path(tmp_dir.name)
+        self.file_path = self.dir / 'django.po'
+
+
+    def test_identical_content_is_not_rewritten(self):
+        self.assertTrue(write_if_changed(self.file_path, b'content'))
+        os.utime(self.file_path, ns=(0, 0))
+
+        self.assertFalse(write_if_changed(self.file_path, b'content'))
+        self.assertEqual(os.stat(self.file_path).st_mtime_ns, 0)
+
+        self.assertTrue(write_if_changed(self.file_path, b'other'))
+        self.assertEqual(self.file_path.read_bytes(), b'other')
+
+
+    def test_failed_write_leaves_old_file_and_no_temporary_files(self):
+        self.file_path.write_bytes(b'old')
+        self.file_path.chmod(0o640)
+        with mock.patch('os.replace', side_effect=OSError):
+            with self.assertRaises(OSError):
+                write_atomic(self.file_path, b'new')
+        self.assertEqual(self.file_path.read_bytes(), b'old')
+        self.assertEqual(os.listdir(self.dir), ['django.po'])
+
+        write_atomic(self.file_path, b'new')
+        self.assertEqual(self.file_path.stat().st_mode & 0o777, 0o640)
+
+
+    def test_hashing_writer_writes_nothing(self):
+        self.file_path.write_bytes(b'content')
+        writer = HashingWriter(self.file_path)
+        writer.write(b'cont')
+        writer.write(b'ent')
+        self.assertTrue(writer.is_unchanged())
+        writer.write(b'!')
+        self.assertFalse(writer.is_unchanged())
+        self.assertFalse(HashingWriter(self.dir / 'missing.po').is_unchanged())
+        self.assertEqual(os.listdir(self.dir), ['django.po'])
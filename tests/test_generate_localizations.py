@@ -0,0 +1,281 @@
+import json
+import pstats
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.utils import translation
+from django.test import SimpleTestCase, override_settings
+
+from django_localizer.management.commands import generate_localizations
+from django_localizer.management.commands.generate_localizations import (
+    Command, LocalePathProcessor, PoFileHeader)
+from django_localizer.manifest import Manifest
+
+from tests.test_one import feed_all
+
+STEW = '''[string_one]
+    en = String one
+    de = String one de
+    ru = Строка один
+
+[{} cars]
+    en = A car
+    en[1] = {} cars
+    de = Ein Auto
+    de[1] = {} Autos
+'''
+
+LANGS = ('de', 'en', 'ru')
+
+
+class TestGenerateLocalizations(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.base_dir = Path(tmp_dir.name)
+        self.locale_dirs = [self.base_dir / name / 'locale' for name in ('one', 'two')]
+        for locale_dir in self.locale_dirs:
+            for lang in LANGS:
+                (locale_dir / lang / 'LC_MESSAGES').mkdir(parents=True)
+            (locale_dir / 'strings.stew').write_text(STEW)
+        settings_override = override_settings(
+            BASE_DIR=str(self.base_dir), LOCALE_PATHS=[str(d) for d in self.locale_dirs])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+    def po_files(self):
+        return {
+            po_file: po_file.read_text()
+            for locale_dir in self.locale_dirs
+            for po_file in sorted(locale_dir.glob('*/LC_MESSAGES/django.po'))
+        }
+
+
+    def test_parallel_output_matches_serial_output(self):
+        call_command('generate_localizations')
+        serial = self.po_files()
+        for po_file in serial:
+            po_file.unlink()
+
+        call_command('generate_localizations', jobs=2, force=True)
+        self.assertEqual(self.po_files(), serial)
+        self.assertEqual(len(serial), 6)
+        for locale_dir in self.locale_dirs:
+            self.assertEqual(sorted(Manifest(locale_dir).langs), list(LANGS))
+
+
+    def test_reports_catalogs_actually_changed(self):
+        stdout = StringIO()
+        call_command('generate_localizations', stdout=stdout)
+        call_command('generate_localizations', force=True, stdout=stdout)
+        self.assertEqual(
+            stdout.getvalue().splitlines(), ['6 catalog(s) changed', '0 catalog(s) changed'])
+
+
+    def test_watch_regenerates_only_affected_locale_dirs(self):
+        call_command('generate_localizations')
+        changed_stew = self.locale_dirs[1] / 'strings.stew'
+        changed_stew.write_text(STEW.replace('String one de', 'Zeichenkette eins'))
+
+        command = Command()
+        self.assertIn(changed_stew, command.watched_paths())
+        changed = command.regenerate({changed_stew})
+        self.assertEqual(changed, [self.locale_dirs[1] / 'de' / 'LC_MESSAGES' / 'django.po'])
+
+
+    def test_single_pass_parses_each_file_once(self):
+        locale_dir = self.locale_dirs[0]
+        (locale_dir / 'more.stew').write_text('[[more]]\n\n[more_key]\n    de = Mehr\n')
+        with mock.patch.object(generate_localizations, 'Stew', wraps=generate_localizations.Stew) as stew:
+            po_files = LocalePathProcessor(locale_dir).build_languages()
+        self.assertEqual(stew.call_count, 2)
+        self.assertEqual(len(po_files), 3)
+
+        writers = feed_all(LocalePathProcessor(locale_dir), LANGS)
+        for lang in LANGS:
+            po_file = locale_dir / lang / 'LC_MESSAGES' / 'django.po'
+            self.assertEqual(
+                po_file.read_text(), PoFileHeader.get_header_for_lang(lang) + writers[lang].text)
+            self.assertEqual(sorted(p.name for p in po_file.parent.iterdir()), ['django.mo', 'django.po'])
+
+
+    def test_messages_spooled_to_disk(self):
+        call_command('generate_localizations', verbosity=0)
+        mo_files = {
+            mo_file: mo_file.read_bytes()
+            for locale_dir in self.locale_dirs
+            for mo_file in locale_dir.glob('*/LC_MESSAGES/django.mo')
+        }
+        with mock.patch.object(generate_localizations, 'SPOOL_SIZE', 16):
+            call_command('generate_localizations', verbosity=0, force=True)
+        self.assertEqual({mo_file: mo_file.read_bytes() for mo_file in mo_files}, mo_files)
+
+
+    def test_duplicate_keys_in_a_locale_dir(self):
+        locale_dir = self.locale_dirs[0]
+        (locale_dir / 'more.stew').write_text(
+            '[string_one]\n    de = Anders\n\n[{} cars]\n    de = Ein Auto\n    de[1] = {} Autos\n')
+        processor = LocalePathProcessor(locale_dir)
+        processor.process()
+        self.assertEqual(processor.warnings, [
+            '[{} cars] is defined in both more.stew and strings.stew',
+            '[string_one] is translated differently in more.stew and strings.stew, '
+            'the translations from more.stew are used',
+        ])
+        po_file = locale_dir / 'de' / 'LC_MESSAGES' / 'django.po'
+        self.assertEqual(po_file.read_text().count('msgid "string_one"'), 2)
+
+        LocalePathProcessor(locale_dir, dedupe=True).process()
+        po = po_file.read_text()
+        self.assertEqual(po.count('msgid "string_one"'), 1)
+        self.assertIn('# duplicate, see more.stew\n', po)
+        with translation.override('de'):
+            translation.trans_real._translations = {}
+            self.assertEqual(translation.gettext('string_one'), 'Anders')
+
+
+    def test_conflicts_across_locale_dirs(self):
+        (self.locale_dirs[1] / 'strings.stew').write_text(STEW.replace('String one de', 'Anders'))
+        call_command('generate_localizations', verbosity=0)
+        self.assertEqual(Command().check_keys(), [
+            f'string_one is translated differently in {self.locale_dirs[0]} and '
+            f'{self.locale_dirs[1]}, the translations from {self.locale_dirs[0]} are used',
+        ])
+
+
+    # msgfmt --check-format, run by compilemessages, would reject a format
+    # flag, as the msgid is the key.
+    def test_placeholders_are_listed_without_a_format_flag(self):
+        call_command('generate_localizations', verbosity=0)
+        po_text = (self.locale_dirs[0] / 'de' / 'LC_MESSAGES' / 'django.po').read_text()
+        self.assertIn('#. placeholders: {0}\nmsgid "{} cars"\n', po_text)
+        self.assertNotIn('#,', po_text)
+
+
+    def test_mismatched_placeholders_fail_the_build(self):
+        (self.locale_dirs[0] / 'strings.stew').write_text(
+            STEW + '\n[hello]\n    en = Hello, {name}\n    de = Hallo, {nmae}\n')
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs), self.assertRaisesMessage(
+                    CommandError, '[hello] (de): {nmae} not in the en translation'):
+                call_command('generate_localizations', jobs=jobs, verbosity=0)
+            self.assertEqual(list(self.locale_dirs[0].glob('*/LC_MESSAGES/django.*')), [])
+
+
+    def test_prune_leaves_out_unused_keys(self):
+        templates = self.base_dir / 'templates'
+        templates.mkdir()
+        (templates / 'index.html').write_text("{% translate 'string_one' %}")
+        with override_settings(TEMPLATES=[{
+                'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                'DIRS': [str(templates)]}]):
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs):
+                    stdout = StringIO()
+                    call_command('generate_localizations', jobs=jobs, prune=True, force=True,
+                                 stdout=stdout)
+                    self.assertIn('2 unused key(s) left out of the catalogs', stdout.getvalue())
+                    po = (self.locale_dirs[0] / 'de' / 'LC_MESSAGES' / 'django.po').read_text()
+                    self.assertIn('msgid "string_one"', po)
+                    self.assertNotIn('msgid "{} cars"', po)
+                    self.assertIn('# unused\n', po)
+
+            # A key coming into use regenerates the catalogs.
+            (templates / 'index.html').write_text("{% translate '{} cars' 2 %}")
+            call_command('generate_localizations', prune=True, verbosity=0)
+            po = (self.locale_dirs[0] / 'de' / 'LC_MESSAGES' / 'django.po').read_text()
+            self.assertIn('msgid "{} cars"', po)
+            self.assertNotIn('msgid "string_one"', po)
+
+
+    def files(self):
+        return {
+            file_path: file_path.stat().st_mtime_ns
+            for file_path in self.base_dir.rglob('*') if file_path.is_file()
+        }
+
+
+    def test_check_writes_nothing_and_fails_on_stale_catalogs(self):
+        call_command('generate_localizations', verbosity=0)
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                stdout = StringIO()
+                call_command('generate_localizations', check=True, jobs=jobs, stdout=stdout)
+                self.assertEqual(stdout.getvalue(), 'All the catalogs are up to date\n')
+
+        stew = self.locale_dirs[1] / 'strings.stew'
+        stew.write_text(stew.read_text().replace('String one de', 'Zeichenkette eins'))
+        lang_dir = self.locale_dirs[1] / 'de' / 'LC_MESSAGES'
+        files = self.files()
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                stderr = StringIO()
+                with self.assertRaisesMessage(CommandError, '2 file(s) out of date'):
+                    call_command('generate_localizations', check=True, jobs=jobs, stderr=stderr)
+                self.assertEqual(stderr.getvalue().split(), [
+                    str(lang_dir / 'django.po'), str(lang_dir / 'django.mo')])
+        self.assertEqual(self.files(), files)
+
+
+    def test_check_reports_unformatted_stew_files(self):
+        call_command('generate_localizations', verbosity=0)
+        stew = self.locale_dirs[0] / 'strings.stew'
+        stew.write_text(stew.read_text() + '\n\n\n')
+        with self.assertRaisesMessage(CommandError, '1 file(s) out of date'):
+            call_command('generate_localizations', check=True, stderr=StringIO())
+
+
+    def test_timings(self):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                stdout = StringIO()
+                call_command('generate_localizations', jobs=jobs, force=True, timings='json',
+                             verbosity=0, stdout=stdout)
+                records = {
+                    (record['stage'], record['locale_dir']): record
+                    for record in json.loads(stdout.getvalue())
+                }
+                self.assertIn(('total', None), records)
+                for locale_dir in self.locale_dirs:
+                    for stage in ('discover', 'parse', 'render', 'po', 'mo', 'manifest'):
+                        self.assertIn((stage, str(locale_dir)), records)
+                if jobs == 1:
+                    po = records['po', str(self.locale_dirs[0])]
+                    self.assertEqual(po['files'], 3)
+                    self.assertGreater(po['bytes'], 0)
+
+
+    def test_timings_table_and_profile(self):
+        profile = self.base_dir / 'generate.prof'
+        stdout = StringIO()
+        call_command('generate_localizations', timings='table', profile=str(profile),
+                     verbosity=0, stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[0].split()[:3], ['stage', 'locale', 'dir'])
+        self.assertTrue(any(line.startswith('render ') for line in lines))
+        self.assertGreater(pstats.Stats(str(profile)).total_calls, 0)
+
+
+    def test_new_language_dir_is_generated(self):
+        (self.locale_dirs[0] / 'strings.stew').write_text(
+            STEW.replace('    ru = Строка один\n', '    ru = Строка один\n    fr = Chaîne un\n'))
+        call_command('generate_localizations', verbosity=0)
+        (self.locale_dirs[0] / 'fr' / 'LC_MESSAGES').mkdir(parents=True)
+        stdout = StringIO()
+        call_command('generate_localizations', stdout=stdout)
+        self.assertEqual(stdout.getvalue(), '1 catalog(s) changed\n')
+        self.assertTrue((self.locale_dirs[0] / 'fr' / 'LC_MESSAGES' / 'django.po').exists())
+
+
+    def test_relative_locale_paths(self):
+        with override_settings(LOCALE_PATHS=['one/locale', 'two/../two/locale']):
+            self.assertEqual(Command().locale_paths, self.locale_dirs)
+            stdout = StringIO()
+            call_command('generate_localizations', stdout=stdout)
+        self.assertEqual(stdout.getvalue(), '6 catalog(s) changed\n')
+        po = (self.locale_dirs[0] / 'de' / 'LC_MESSAGES' / 'django.po').read_text()
+        self.assertIn(f'### from {Path("one", "locale", "strings.stew")}\n', po)
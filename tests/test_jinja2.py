@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+
+from django.utils import translation
+
+from .test_translate import LocalizedTestCase
+
+try:
+    import jinja2
+    from django_localizer import jinja2 as extension_module
+except ImportError:
+    jinja2 = None
+
+
+@unittest.skipUnless(jinja2, 'Jinja2 is not installed')
+class TestTranslateExtension(LocalizedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.environment = jinja2.Environment(
+            autoescape=True, extensions=['django_localizer.jinja2.TranslateExtension'])
+
+
+    def render(self, source, **context):
+        return self.environment.from_string(source).render(**context)
+
+
+    def test_translate_tag(self):
+        with translation.override('ru'):
+            self.assertEqual(self.render("{% translate 'greeting' %}"), 'Привет')
+            self.assertEqual(self.render("{% translate '{} cars', 5 %}"), '5 машин')
+            self.assertEqual(self.render("{% translate key, n %}", key='{} cars', n=2), '2 машины')
+            self.assertEqual(
+                self.render("{% translate 'hello_name', name=name %}", name='<b>'),
+                'Привет, &lt;b&gt;')
+
+
+    def test_functions(self):
+        with translation.override('ru'):
+            self.assertEqual(self.render("{{ translate('{} cars', 1) }}"), '1 машина')
+            self.assertEqual(
+                self.render("{{ translate_many(['greeting', 'farewell'])['farewell'] }}"), 'Пока')
+
+
+    def test_literal_invocations_are_resolved_once_per_language(self):
+        template = self.environment.from_string("{% translate 'greeting', name='x' %}")
+        with mock.patch.object(
+                extension_module, 'translate', wraps=extension_module.translate) as tr:
+            for lang, expected in (('ru', 'Привет'), ('ru', 'Привет'), ('en', 'Hello')):
+                with translation.override(lang):
+                    self.assertEqual(template.render(), expected)
+        self.assertEqual(tr.call_count, 2)
+
+
+    def test_syntax_errors(self):
+        with self.assertRaises(jinja2.TemplateSyntaxError):
+            self.environment.from_string("{% translate 'greeting', name='x', 5 %}")
@@ -0,0 +1,100 @@
+import tempfile
+from pathlib import Path
+
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+from django_localizer import manifest
+from django_localizer.manifest import MANIFEST_NAME, Manifest
+from django_localizer.settings import LOCALIZER
+
+STEW = '''[string_one]
+    en = String one
+    de = String one de
+'''
+
+
+class TestIncrementalGeneration(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.base_dir = Path(tmp_dir.name)
+        self.locale_dir = self.base_dir / 'locale'
+        for lang in ('en', 'de'):
+            (self.locale_dir / lang / 'LC_MESSAGES').mkdir(parents=True)
+        self.stew_file = self.locale_dir / 'strings.stew'
+        self.stew_file.write_text(STEW)
+        settings_override = override_settings(BASE_DIR=str(self.base_dir))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+    def process(self, **kwargs):
+        return LocalePathProcessor(self.locale_dir).process(**kwargs)
+
+
+    def test_first_run_writes_manifest(self):
+        po_files = self.process()
+        self.assertEqual(
+            po_files,
+            [self.locale_dir / lang / 'LC_MESSAGES' / 'django.po' for lang in ('de', 'en')])
+        for po_file in po_files:
+            self.assertTrue(po_file.with_suffix('.mo').exists())
+        manifest = Manifest(self.locale_dir)
+        self.assertEqual(list(manifest.inputs), ['strings.stew'])
+        self.assertEqual(sorted(manifest.langs), ['de', 'en'])
+
+
+    def test_unchanged_inputs_are_skipped_without_parsing(self):
+        self.process()
+        processor = LocalePathProcessor(self.locale_dir)
+        self.assertEqual(processor.process(), [])
+        self.assertNotIn('strings_txt', processor.__dict__)
+
+
+    def test_only_changed_languages_are_rebuilt(self):
+        self.process()
+        self.stew_file.write_text(STEW.replace('String one de', 'Zeichenkette eins'))
+
+        self.assertEqual(self.process(), [self.locale_dir / 'de' / 'LC_MESSAGES' / 'django.po'])
+
+
+    def test_missing_mo_file_is_rebuilt(self):
+        self.process()
+        (self.locale_dir / 'en' / 'LC_MESSAGES' / 'django.mo').unlink()
+
+        self.assertEqual(self.process(), [self.locale_dir / 'en' / 'LC_MESSAGES' / 'django.po'])
+
+
+    def test_force_rebuilds_everything(self):
+        self.process()
+        mo_file = self.locale_dir / 'en' / 'LC_MESSAGES' / 'django.mo'
+        mo_file.write_bytes(b'corrupted')
+
+        self.assertEqual(self.process(force=True), [mo_file.with_suffix('.po')])
+        self.assertNotEqual(mo_file.read_bytes(), b'corrupted')
+
+
+    def test_manifest_of_other_version_is_ignored(self):
+        self.process()
+        (self.locale_dir / MANIFEST_NAME).write_text('{"version": "0.0.0", "inputs": {"a": "b"}}')
+        self.assertEqual(Manifest(self.locale_dir).inputs, {})
+
+
+    def test_new_generator_version_rebuilds_everything(self):
+        self.process()
+        with mock.patch.object(manifest, 'GENERATOR_VERSION', manifest.GENERATOR_VERSION + 1):
+            self.assertFalse(LocalePathProcessor(self.locale_dir).is_up_to_date())
+        self.assertEqual(
+            Manifest(self.locale_dir).options['generator'], manifest.GENERATOR_VERSION)
+
+
+    def test_new_base_language_rebuilds_everything(self):
+        self.process()
+        with mock.patch.dict(LOCALIZER, {'BASE_LANGUAGE': 'de'}):
+            self.assertFalse(LocalePathProcessor(self.locale_dir).is_up_to_date())
+        with override_settings(LANGUAGE_CODE='de'):
+            self.assertFalse(LocalePathProcessor(self.locale_dir).is_up_to_date())
+        self.assertTrue(LocalePathProcessor(self.locale_dir).is_up_to_date())
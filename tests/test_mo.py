@@ -0,0 +1,90 @@
+import gettext
+import io
+import struct
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from django.test import SimpleTestCase, override_settings
+
+from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+from django_localizer.mo import generate_mo, hash_string, unescape
+
+STEW = '''[string_one]
+    en = String one
+    ru = Строка "один"\\nвторая строка
+
+[{} cars]
+    en = A car
+    en[1] = {} cars
+    ru = {} машина
+    ru[1] = {} машины
+    ru[2] = {} машин
+    ru[3] = {} машины
+'''
+
+
+def lookup_in_hash_table(mo, msgid):
+    _, _, count, originals, _, size, offset = struct.unpack('<7I', mo[:28])
+    table = struct.unpack(f'<{size}I', mo[offset:offset + size * 4])
+    hval = hash_string(msgid)
+    slot = hval % size
+    incr = 1 + hval % (size - 2)
+    while table[slot]:
+        index = table[slot] - 1
+        length, string_offset = struct.unpack('<2I', mo[originals + index * 8:originals + index * 8 + 8])
+        if mo[string_offset:string_offset + length] == msgid:
+            return index
+        slot = (slot + incr) % size
+
+
+class TestGenerateMo(TestCase):
+    def setUp(self):
+        self.messages = {
+            '': 'Content-Type: text/plain; charset=UTF-8\nPlural-Forms: nplurals=2; plural=(n != 1);\n',
+            'key': 'Schlüssel',
+            'car\0car': 'Auto\0Autos',
+        }
+        self.mo = generate_mo(self.messages)
+
+
+    def test_readable_by_gettext(self):
+        translation = gettext.GNUTranslations(io.BytesIO(self.mo))
+        self.assertEqual(translation.gettext('key'), 'Schlüssel')
+        self.assertEqual(translation.ngettext('car', 'car', 1), 'Auto')
+        self.assertEqual(translation.ngettext('car', 'car', 5), 'Autos')
+
+
+    def test_hash_table_finds_every_msgid(self):
+        msgids = sorted(msgid.encode() for msgid in self.messages)
+        for index, msgid in enumerate(msgids):
+            self.assertEqual(lookup_in_hash_table(self.mo, msgid), index)
+        self.assertIsNone(lookup_in_hash_table(self.mo, b'missing'))
+
+
+    def test_unescape(self):
+        self.assertEqual(unescape(r'a\nb \"c\" \\ \q'), 'a\nb "c" \\ \\q')
+
+
+class TestLocalePathProcessorMoFiles(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.locale_dir = Path(tmp_dir.name) / 'locale'
+        (self.locale_dir / 'ru' / 'LC_MESSAGES').mkdir(parents=True)
+        (self.locale_dir / 'strings.stew').write_text(STEW)
+        settings_override = override_settings(BASE_DIR=tmp_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+    def test_mo_file_is_written_from_stew_data(self):
+        LocalePathProcessor(self.locale_dir).process()
+        with open(self.locale_dir / 'ru' / 'LC_MESSAGES' / 'django.mo', 'rb') as mo_file:
+            translation = gettext.GNUTranslations(mo_file)
+
+        self.assertEqual(translation.gettext('string_one'), 'Строка "один"\nвторая строка')
+        self.assertEqual(translation.ngettext('{} cars', '{} cars', 1), '{} машина')
+        self.assertEqual(translation.ngettext('{} cars', '{} cars', 3), '{} машины')
+        self.assertEqual(translation.ngettext('{} cars', '{} cars', 5), '{} машин')
+        self.assertEqual(translation.info()['language'], 'ru')
@@ -1,27 +1,56 @@
 from pathlib import Path
 from unittest import TestCase
 
-# from django_localizer.management.commands.deps.strings_txt import StringsTxt
+from django_localizer.keys import KeyIndex
 from django_localizer.management.commands.generate_localizations import LocalePathProcessor
 
 
+# Keeps what a CatalogWriter would write into the .po and .mo files.
+class RecordingWriter:
+    def __init__(self):
+        self.text = ''
+        self.messages = {}
+
+
+    def write(self, text):
+        self.text += text
+
+
+    def add_message(self, msgid, msgstr):
+        self.messages.setdefault(msgid, msgstr)
+
+
+def feed_all(processor, langs):
+    writers = {lang: RecordingWriter() for lang in langs}
+    index = KeyIndex()
+    for stew_file in processor.strings_txt:
+        processor.feed_entries(stew_file, writers, index)
+    return writers
+
+
+HEADER = '\n### from tests/strings.stew\n\n# [[test strings txt]]\n'
+
+
 class TestLocalePathProcessor(TestCase):
     def test_locale_path_processor_one_plural(self):
-        strings_path = Path('tests')
-        processor = LocalePathProcessor(strings_path)
-        l = list(processor.generate_po_file('en'))
-        self.assertSequenceEqual(l, ['msgid "string_one"\n', 'msgstr "String one"\n', '\n'])
+        processor = LocalePathProcessor(Path('tests'), read_only=True)
+        writer = feed_all(processor, ['en'])['en']
+        self.assertEqual(writer.text, HEADER + 'msgid "string_one"\nmsgstr "String one"\n\n')
+        self.assertEqual(writer.messages, {'string_one': 'String one'})
 
 
     def test_locale_path_processor_many_plurals(self):
-        strings_path = Path('tests')
-        processor = LocalePathProcessor(strings_path)
-        l = list(processor.generate_po_file('ru'))
-        self.assertSequenceEqual(
-            l, [
+        processor = LocalePathProcessor(Path('tests'), read_only=True)
+        writer = feed_all(processor, ['ru'])['ru']
+        self.assertEqual(
+            writer.text, HEADER + ''.join([
                 'msgid "string_one"\n',
+                'msgid_plural "string_one"\n',
                 'msgstr[0] "%s машина стол"\n',
                 'msgstr[1] "%s машины стола"\n',
                 'msgstr[2] "%s машин столов"\n',
                 'msgstr[3] "%s машины столам"\n',
-                '\n'])
+                '\n']))
+        self.assertEqual(
+            writer.messages['string_one\0string_one'].split('\0'),
+            ['%s машина стол', '%s машины стола', '%s машин столов', '%s машины столам'])
@@ -0,0 +1,32 @@
+import unittest
+
+from django_localizer.placeholders import check_placeholders, placeholders
+
+
+class TestPlaceholders(unittest.TestCase):
+    def test_placeholders(self):
+        self.assertEqual(placeholders('No placeholders, {{escaped}}'), set())
+        self.assertEqual(placeholders('{} and {}'), {'0', '1'})
+        self.assertEqual(placeholders('{0} {name.title} {items[0]:>{width}}'),
+                         {'0', 'name', 'items', 'width'})
+        for string in ('{} {0}', 'unbalanced {', 'unbalanced }'):
+            with self.subTest(string=string), self.assertRaises(ValueError):
+                placeholders(string)
+
+
+    def test_check_placeholders(self):
+        fields, errors, warnings = check_placeholders('[cars]', {
+            'en': ['A car', '{} cars in {city}'],
+            'de': ['Ein Auto', '{} Autos'],
+            'ru': ['{} машина в {town}'],
+            'fr': ['{'],
+        }, ['en_US', 'en'])
+        self.assertEqual(fields, ['0', 'city'])
+        self.assertEqual(errors, [
+            "[cars] (fr): Single '{' encountered in format string in \"{\"",
+            '[cars] (ru): {town} not in the en translation',
+        ])
+        self.assertEqual(warnings, [
+            '[cars] (de): {city} of the en translation not used',
+            '[cars] (fr): {0}, {city} of the en translation not used',
+        ])
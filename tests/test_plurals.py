@@ -0,0 +1,33 @@
+import gettext
+import unittest
+
+from django_localizer.plurals import RULES, compile_plural, get_plural_rule, plural_forms
+
+
+class TestPluralRules(unittest.TestCase):
+    def test_functions_match_the_expressions(self):
+        for name, rule in RULES.items():
+            expression = gettext.c2py(rule.expression)
+            for n in range(1000):
+                with self.subTest(rule=name, n=n):
+                    self.assertEqual(rule.func(n), expression(n))
+                    self.assertLess(rule.func(n), rule.nplurals)
+
+
+    def test_lookup(self):
+        self.assertIs(get_plural_rule('ru'), RULES['russian'])
+        self.assertIs(get_plural_rule('pt-br'), RULES['zero_one'])
+        self.assertIs(get_plural_rule('pt_BR'), RULES['zero_one'])
+        self.assertIs(get_plural_rule('pt'), RULES['one'])
+        self.assertIs(get_plural_rule('sr-latn'), RULES['east_slavic'])
+        self.assertIs(get_plural_rule('xx'), RULES['one'])
+
+
+    def test_plural_forms(self):
+        self.assertEqual(plural_forms('fr'), 'nplurals=2; plural=(n > 1);')
+        self.assertEqual(plural_forms('ja'), 'nplurals=1; plural=0;')
+
+
+    def test_compile_plural(self):
+        self.assertIs(compile_plural('(n>1)'), RULES['zero_one'].func)
+        self.assertEqual(compile_plural('n%3')(5), 2)
@@ -0,0 +1,99 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import translation
+
+from django_localizer.management.commands import generate_localizations
+from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+from django_localizer.settings import LOCALIZER
+from django_localizer.shards import (
+    clear_sharded_catalogs, get_sharded_catalog, shard_path, write_shards)
+from django_localizer.translate import translate
+
+from tests.test_translate import LocalizedTestCase
+
+MORE_STEW = '''[greeting]
+    ru = Здравствуйте
+
+[question]
+    en = How are you?
+    ru = Как дела?
+'''
+
+
+class TestShards(LocalizedTestCase):
+    def setUp(self):
+        super().setUp()
+        shard_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(shard_dir.cleanup)
+        self.shard_dir = shard_dir.name
+        more_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(more_dir.cleanup)
+        self.more_dir = Path(more_dir.name) / 'more' / 'locale'
+        self.more_dir.mkdir(parents=True)
+        (self.more_dir / 'more.stew').write_text(MORE_STEW)
+        patcher = mock.patch.dict(LOCALIZER, {'SHARD_DIR': self.shard_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def write_shards(self):
+        with override_settings(BASE_DIR=self.tmp_dir.name):
+            return write_shards(self.shard_dir, [
+                LocalePathProcessor(self.locale_dir), LocalePathProcessor(self.more_dir)])
+
+
+    def test_one_shard_per_stew_file_and_language(self):
+        self.assertEqual(len(self.write_shards()), 4)
+        self.assertTrue(Path(shard_path(self.shard_dir, 'ru', 'locale.strings')).exists())
+        self.assertEqual(self.write_shards(), [])
+
+
+    def test_shards_are_opened_on_first_use(self):
+        self.write_shards()
+        catalog = get_sharded_catalog(self.shard_dir, 'ru')
+        self.assertEqual(catalog.get('greeting'), (False, ['Привет']))
+        self.assertEqual(list(catalog.shards), ['locale.strings'])
+        self.assertEqual(catalog.get('{} cars')[1][2], '{} машин')
+        self.assertEqual(len(catalog.shards), 1)
+        self.assertIsNone(catalog.get('missing'))
+
+
+    def test_translate_from_the_shards(self):
+        self.write_shards()
+        with translation.override('ru'):
+            # The first definition of a key wins, as in the catalogs.
+            self.assertEqual(translate('greeting'), 'Привет')
+            self.assertEqual(translate('{} cars', 5), '5 машин')
+            self.assertEqual(translate('hello_name', name='Вася'), 'Привет, Вася')
+        with translation.override('en'):
+            self.assertEqual(translate('question'), 'How are you?')
+
+
+    def test_removed_shards_are_deleted(self):
+        self.write_shards()
+        (self.more_dir / 'more.stew').unlink()
+        self.write_shards()
+        self.assertEqual(
+            [file_path.name for file_path in (Path(self.shard_dir) / 'ru').iterdir()],
+            ['locale.strings.idx'])
+
+
+    def test_languages_without_catalogs_are_sharded_again(self):
+        stew_path = self.more_dir / 'more.stew'
+        with override_settings(BASE_DIR=str(self.more_dir.parent.parent),
+                               LOCALE_PATHS=[str(self.more_dir)]):
+            call_command('generate_localizations', verbosity=0)
+            stew_path.write_text(stew_path.read_text().replace('Как дела?', 'Как ты?'))
+            with mock.patch.object(generate_localizations, 'Stew',
+                                   wraps=generate_localizations.Stew) as stew:
+                call_command('generate_localizations', verbosity=0)
+        # Parsed once, to generate the catalogs, and not again for the shards.
+        self.assertEqual(stew.call_count, 1)
+        clear_sharded_catalogs()
+        self.addCleanup(clear_sharded_catalogs)
+        catalog = get_sharded_catalog(self.shard_dir, 'ru')
+        self.assertEqual(catalog.get('question'), (False, ['Как ты?']))
@@ -0,0 +1,114 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.template import Context, Engine
+from django.utils import translation
+
+from django_localizer.settings import LOCALIZER
+from django_localizer.signals import stats_flushed, translation_missing
+from django_localizer.stats import load_stats
+from django_localizer.translate import disable_stats, enable_stats, translate
+
+from .test_translate import LocalizedTestCase
+
+
+class TestStats(LocalizedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stats_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.stats_dir.cleanup)
+        self.stats = enable_stats(1.0, self.stats_dir.name, flush_every=0)
+        self.addCleanup(disable_stats)
+
+
+    def test_counts_calls_and_missing_translations(self):
+        missing = []
+        def receiver(sender, lang, key, **kwargs):
+            missing.append((lang, key))
+        translation_missing.connect(receiver)
+        self.addCleanup(translation_missing.disconnect, receiver)
+
+        with translation.override('ru'):
+            translate('greeting')
+            translate('greeting')
+            translate('nope')
+            translate('nope')
+        self.assertEqual(self.stats.calls, {('ru', 'greeting'): 2, ('ru', 'nope'): 2})
+        self.assertEqual(self.stats.missing, {('ru', 'nope'): 2})
+        self.assertGreater(self.stats.seconds['translate'], 0)
+        # The signal is only sent when the translation is looked up.
+        self.assertEqual(missing, [('ru', 'nope')])
+
+
+    def test_sampling(self):
+        stats = enable_stats(0.0)
+        with translation.override('ru'):
+            translate('greeting')
+        self.assertEqual(stats.sampled, 0)
+
+
+    def test_template_tag_calls_are_counted(self):
+        engine = Engine(libraries={'translate': 'django_localizer.templatetags.translate'})
+        template = engine.from_string("{% load translate %}{% translate 'greeting' %}")
+        with translation.override('ru'):
+            template.render(Context())
+            template.render(Context())
+        self.assertEqual(self.stats.calls, {('ru', 'greeting'): 2})
+        self.assertGreater(self.stats.seconds['template'], 0)
+
+
+    def test_flush_and_report(self):
+        flushed = []
+        def receiver(sender, stats, **kwargs):
+            flushed.append(stats)
+        stats_flushed.connect(receiver)
+        self.addCleanup(stats_flushed.disconnect, receiver)
+
+        with translation.override('ru'):
+            translate('greeting')
+            translate('nope')
+        self.stats.flush()
+        self.assertEqual(len(flushed), 1)
+        # Another process, which sampled half of its calls.
+        (Path(self.stats_dir.name) / 'other.json').write_text(json.dumps({
+            'sample_rate': 0.5,
+            'calls': [['ru', 'greeting', 3]],
+            'missing': [],
+            'seconds': {'translate': 0.5},
+        }))
+        report = load_stats(self.stats_dir.name)
+        self.assertEqual(report['processes'], 2)
+        self.assertEqual(report['calls'], {('ru', 'greeting'): 7, ('ru', 'nope'): 1})
+
+        out = StringIO()
+        with mock.patch.dict(LOCALIZER, {'STATS_DIR': self.stats_dir.name}):
+            call_command('translation_stats', json=True, clear=True, stdout=out)
+        data = json.loads(out.getvalue())
+        self.assertEqual(data['calls'], [['ru', 'greeting', 7], ['ru', 'nope', 1]])
+        self.assertEqual(data['missing'], [['ru', 'nope', 1]])
+        self.assertEqual(list(Path(self.stats_dir.name).iterdir()), [])
+
+
+    def test_flushes_write_what_was_recorded_since_the_previous_one(self):
+        with translation.override('ru'):
+            translate('greeting')
+            self.stats.flush()
+            translate('greeting')
+            self.stats.flush()
+        self.assertEqual(self.stats.calls, {})
+        self.assertEqual(len(list(Path(self.stats_dir.name).iterdir())), 2)
+        report = load_stats(self.stats_dir.name)
+        self.assertEqual(report['processes'], 1)
+        self.assertEqual(report['calls'], {('ru', 'greeting'): 2})
+
+        # The statistics cleared once reported do not come back.
+        with mock.patch.dict(LOCALIZER, {'STATS_DIR': self.stats_dir.name}):
+            call_command('translation_stats', clear=True, stdout=StringIO())
+        with translation.override('ru'):
+            translate('greeting')
+        self.stats.flush()
+        self.assertEqual(load_stats(self.stats_dir.name)['calls'], {('ru', 'greeting'): 1})
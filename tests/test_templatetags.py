@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.template import Context, Engine, TemplateSyntaxError
+from django.utils import translation
+
+from django_localizer.templatetags import translate as translate_tags
+from django_localizer.translate import clear_cache
+
+from .test_translate import LocalizedTestCase
+
+engine = Engine(libraries={'translate': 'django_localizer.templatetags.translate'})
+
+
+def render(template_code, **context):
+    return engine.from_string('{% load translate %}' + template_code).render(Context(context))
+
+
+class TestTranslateTag(LocalizedTestCase):
+    def test_literal_and_variable_arguments(self):
+        with translation.override('ru'):
+            self.assertEqual(render("{% translate 'greeting' %}"), 'Привет')
+            self.assertEqual(render("{% translate '{} cars' 5 %}"), '5 машин')
+            self.assertEqual(render("{% translate key n %}", key='{} cars', n=2), '2 машины')
+            self.assertEqual(
+                render("{% translate 'hello_name' name=name %}", name='<b>'),
+                'Привет, &lt;b&gt;')
+
+
+    def test_as_var(self):
+        with translation.override('ru'):
+            self.assertEqual(
+                render("{% translate 'hello_name' name=name as hi %}[{{ hi }}]", name='Вася'),
+                '[Привет, Вася]')
+
+
+    def test_literal_invocations_are_cached_per_language(self):
+        template = engine.from_string("{% load translate %}{% translate 'greeting' %}")
+        with mock.patch.object(translate_tags, 'tr', wraps=translate_tags.tr) as tr:
+            with translation.override('ru'):
+                self.assertEqual(template.render(Context()), 'Привет')
+                self.assertEqual(template.render(Context()), 'Привет')
+            with translation.override('en'):
+                self.assertEqual(template.render(Context()), 'Hello')
+            self.assertEqual(tr.call_count, 2)
+
+            clear_cache()
+            with translation.override('en'):
+                template.render(Context())
+            self.assertEqual(tr.call_count, 3)
+
+
+    def test_syntax_errors(self):
+        with self.assertRaises(TemplateSyntaxError):
+            render('{% translate %}')
+        with self.assertRaises(TemplateSyntaxError):
+            render("{% translate 'hello_name' name='x' 5 %}")
+
+
+class TestTranslateManyTag(LocalizedTestCase):
+    def test_loads_dict_into_context(self):
+        with translation.override('ru'):
+            self.assertEqual(
+                render("{% translate_many 'greeting' keys as strings %}"
+                       "{{ strings.greeting }}|{{ strings.farewell }}", keys=['farewell']),
+                'Привет|Пока')
+
+
+    def test_requires_as_var(self):
+        with self.assertRaises(TemplateSyntaxError):
+            render("{% translate_many 'greeting' %}")
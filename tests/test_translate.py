@@ -0,0 +1,245 @@
+import contextvars
+import copy
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import SimpleTestCase, override_settings
+from django.utils import translation
+
+from django_localizer.management.commands.generate_localizations import LocalePathProcessor
+from django_localizer.settings import LOCALIZER
+from django_localizer.translate import (
+    cache_info, clear_cache, get_translator, translate, translate_lazy, translate_many, warm_up)
+
+STEW = '''[greeting]
+    en = Hello
+    ru = Привет
+
+[farewell]
+    en = Bye
+    ru = Пока
+
+[hello_name]
+    en = Hello, {name}
+    ru = Привет, {name}
+
+[{} cars]
+    en = {} car
+    en[1] = {} cars
+    ru = {} машина
+    ru[1] = {} машины
+    ru[2] = {} машин
+    ru[3] = {} машины
+'''
+
+
+class LocalizedTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.locale_dir = locale_dir = Path(cls.tmp_dir.name) / 'locale'
+        for lang in ('en', 'ru'):
+            (locale_dir / lang / 'LC_MESSAGES').mkdir(parents=True)
+        (locale_dir / 'strings.stew').write_text(STEW)
+        with override_settings(BASE_DIR=cls.tmp_dir.name):
+            LocalePathProcessor(locale_dir).process()
+        cls.settings_override = override_settings(LOCALE_PATHS=[str(locale_dir)])
+        cls.settings_override.enable()
+
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.tmp_dir.cleanup()
+        super().tearDownClass()
+
+
+    def setUp(self):
+        clear_cache()
+
+
+class TestTranslate(LocalizedTestCase):
+    def test_translate(self):
+        with translation.override('ru'):
+            self.assertEqual(translate('greeting'), 'Привет')
+            self.assertEqual(translate('hello_name', name='Вася'), 'Привет, Вася')
+            self.assertEqual(translate('{} cars', 1), '1 машина')
+            self.assertEqual(translate('{} cars', 3), '3 машины')
+            self.assertEqual(translate('{} cars', 5), '5 машин')
+        with translation.override('en'):
+            self.assertEqual(translate('{} cars', 5), '5 cars')
+
+
+    def test_cache_is_keyed_by_language_and_plural_form(self):
+        with translation.override('ru'):
+            translate('{} cars', 5)
+            translate('{} cars', 6)
+            translate('{} cars', 2)
+        with translation.override('en'):
+            translate('{} cars', 5)
+        info = cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 3, 3))
+
+
+    def test_cache_is_cleared_when_translations_change(self):
+        with translation.override('ru'):
+            translate('greeting')
+        with override_settings(LANGUAGE_CODE='ru'):
+            self.assertEqual(cache_info().currsize, 0)
+
+
+class TestTranslateMany(LocalizedTestCase):
+    def test_translate_many(self):
+        with translation.override('ru'):
+            self.assertEqual(
+                translate_many(['greeting', ('{} cars', (5,)), ('hello_name', (), {'name': 'Вася'})]),
+                {'greeting': 'Привет', '{} cars': '5 машин', 'hello_name': 'Привет, Вася'})
+
+
+    def test_single_argument(self):
+        with translation.override('ru'):
+            self.assertEqual(translate_many([('{} cars', 5)]), {'{} cars': '5 машин'})
+            with self.assertRaisesMessage(TypeError, "not ('{} cars', 5, 6)"):
+                translate_many([('{} cars', 5, 6)])
+            with self.assertRaisesMessage(TypeError, 'translate_many() items must be'):
+                translate_many([('{} cars', (5,), {}, {})])
+
+
+    def test_shares_the_cache_with_translate(self):
+        with translation.override('ru'):
+            translate('greeting')
+            translate_many(['greeting', ('{} cars', (2,))])
+            self.assertEqual(translate('{} cars', 3), '3 машины')
+        info = cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 2))
+
+
+class TestWarmUp(LocalizedTestCase):
+    def test_warm_up_primes_the_cache(self):
+        warm_up(['ru'], ['greeting', ('{} cars', 5)])
+        self.assertEqual(cache_info().currsize, 2)
+        with translation.override('ru'):
+            self.assertEqual(translate('greeting'), 'Привет')
+            self.assertEqual(translate('{} cars', 6), '6 машин')
+        info = cache_info()
+        self.assertEqual((info.hits, info.currsize), (2, 2))
+
+
+    def test_warm_up_all_languages(self):
+        with override_settings(LANGUAGES=[('en', 'English'), ('ru', 'Russian')]):
+            warm_up(True, ['greeting'])
+            self.assertEqual(cache_info().currsize, 2)
+
+
+    def test_app_ready_warms_up_the_configured_languages(self):
+        with mock.patch.dict(LOCALIZER, {'PRELOAD_LANGUAGES': ['ru'], 'PRELOAD_KEYS': ['farewell']}):
+            apps.get_app_config('django_localizer').ready()
+        self.assertEqual(cache_info().currsize, 1)
+
+
+class TestTranslateLazy(LocalizedTestCase):
+    def test_translated_when_used(self):
+        greeting = translate_lazy('greeting')
+        cars = translate_lazy('{} cars', 5)
+        self.assertEqual(cache_info().misses, 0)
+        with translation.override('ru'):
+            self.assertEqual(str(greeting), 'Привет')
+            self.assertEqual(f'{cars}!', '5 машин!')
+            self.assertEqual(greeting + '!', 'Привет!')
+            self.assertEqual(json.dumps({'g': greeting}, cls=DjangoJSONEncoder, ensure_ascii=False),
+                             '{"g": "Привет"}')
+        with translation.override('en'):
+            self.assertEqual(greeting, 'Hello')
+
+
+    def test_behaves_like_its_string(self):
+        greeting = translate_lazy('greeting')
+        farewell = translate_lazy('farewell')
+        with translation.override('ru'):
+            self.assertEqual(greeting.upper(), 'ПРИВЕТ')
+            self.assertTrue(greeting.startswith('При'))
+            self.assertEqual(len(greeting), 6)
+            self.assertEqual(greeting[0], 'П')
+            self.assertEqual(greeting[-3:], 'вет')
+            self.assertIn('иве', greeting)
+            self.assertNotIn('Hello', greeting)
+            self.assertEqual(list(greeting), list('Привет'))
+            self.assertEqual(greeting * 2, 'ПриветПривет')
+            self.assertEqual(2 * greeting, 'ПриветПривет')
+            self.assertTrue(farewell < greeting <= 'Привет' < 'Я')
+            self.assertTrue(greeting > farewell and greeting >= 'Привет')
+            self.assertEqual(sorted([greeting, farewell]), [farewell, greeting])
+            with self.assertRaises(AttributeError):
+                greeting.missing
+        self.assertEqual(copy.copy(greeting).key, 'greeting')
+        self.assertEqual(cache_info().misses, 2)
+
+
+    def test_results_are_kept_per_language(self):
+        greeting = translate_lazy('greeting')
+        for _ in range(3):
+            for lang in ('en', 'ru'):
+                with translation.override(lang):
+                    str(greeting)
+        self.assertEqual(cache_info().hits + cache_info().misses, 2)
+        clear_cache()
+        with translation.override('ru'):
+            str(greeting)
+        self.assertEqual(cache_info().misses, 1)
+
+
+class TestTranslator(LocalizedTestCase):
+    def test_translates_into_its_language(self):
+        ru = get_translator('ru')
+        with translation.override('en'):
+            self.assertEqual(ru.translate('greeting'), 'Привет')
+            self.assertEqual(ru.translate('{} cars', 5), '5 машин')
+            self.assertEqual(ru.translate_many(['farewell', ('{} cars', (2,))]),
+                             {'farewell': 'Пока', '{} cars': '2 машины'})
+            self.assertEqual(translate('greeting'), 'Hello')
+
+
+    def test_skips_the_active_language(self):
+        ru = get_translator('ru')
+        with mock.patch('django_localizer.translate.get_language') as get_language, \
+                mock.patch('django_localizer.translate.gettext') as gettext:
+            self.assertEqual(ru.translate('hello_name', name='Вася'), 'Привет, Вася')
+        get_language.assert_not_called()
+        gettext.assert_not_called()
+
+
+    def test_shares_the_cache_with_translate(self):
+        with translation.override('ru'):
+            translate('greeting')
+        self.assertEqual(get_translator('ru').translate('greeting'), 'Привет')
+        self.assertEqual(cache_info().hits, 1)
+
+
+    def test_one_translator_per_language(self):
+        self.assertIs(get_translator('ru'), get_translator('ru'))
+        with translation.override('ru'):
+            self.assertIs(get_translator(), get_translator('ru'))
+
+
+    def test_resolved_again_when_translations_change(self):
+        ru = get_translator('ru')
+        translation_object = ru.translation
+        with override_settings(LOCALE_PATHS=[str(self.locale_dir)]):
+            self.assertEqual(ru.translate('greeting'), 'Привет')
+            self.assertIsNot(ru.translation, translation_object)
+
+
+    def test_context_variable(self):
+        current = contextvars.ContextVar('translator')
+
+        def render():
+            current.set(get_translator('ru'))
+            return current.get().translate('greeting')
+
+        self.assertEqual(contextvars.copy_context().run(render), 'Привет')
+        self.assertIsNone(current.get(None))
@@ -0,0 +1,84 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from django_localizer import usage
+from django_localizer.usage import find_used_keys, python_keys, template_keys
+
+PYTHON = '''
+from django_localizer import translate as _, translate_many
+from django_localizer.translate import get_translator
+
+TITLE = _('title')
+label = translate_lazy("label", 2)
+strings = translate_many(['ok', ('{} cars', (5,)), name])
+get_translator('ru').translate('bound')
+translate(key)
+'''
+
+TEMPLATE = """
+{% load translate %}
+{% translate 'greeting' %} {% translate "{} cars" n as cars %}
+{% translate_many 'ok' "cancel" dialog_keys as strings %}
+{% translate 'fox', n, dog='rex' %}
+{{ translate('jinja_call') }}
+{% translate key %}
+"""
+
+
+class TestScan(SimpleTestCase):
+    def test_python_keys(self):
+        self.assertEqual(python_keys(PYTHON), {'title', 'label', 'ok', '{} cars', 'bound'})
+        self.assertEqual(python_keys("translate('k')"), {'k'})
+
+
+    def test_template_keys(self):
+        self.assertEqual(
+            template_keys(TEMPLATE),
+            {'greeting', '{} cars', 'ok', 'cancel', 'fox', 'jinja_call'})
+
+
+class TestFindUsedKeys(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.base_dir = Path(tmp_dir.name)
+        self.templates = self.base_dir / 'templates'
+        (self.templates / 'node_modules').mkdir(parents=True)
+        (self.templates / 'index.html').write_text(TEMPLATE)
+        (self.templates / 'views.py').write_text(PYTHON)
+        (self.templates / 'node_modules' / 'skipped.html').write_text("{% translate 'skipped' %}")
+        settings_override = override_settings(BASE_DIR=str(self.base_dir), TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'DIRS': [str(self.templates)],
+        }])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+    def test_find_used_keys(self):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                try:
+                    (self.base_dir / usage.CACHE_NAME).unlink()
+                except FileNotFoundError:
+                    pass
+                self.assertEqual(find_used_keys(jobs), {
+                    'greeting', '{} cars', 'ok', 'cancel', 'fox', 'jinja_call', 'title',
+                    'label', 'bound'})
+
+
+    def test_only_changed_files_are_scanned_again(self):
+        find_used_keys()
+        index = self.templates / 'index.html'
+        index.write_text("{% translate 'other' %}")
+        mtime = os.stat(index).st_mtime_ns + 1000000000
+        os.utime(index, ns=(mtime, mtime))
+        with mock.patch.object(usage, 'scan_file', wraps=usage.scan_file) as scan_file:
+            keys = find_used_keys()
+        scan_file.assert_called_once_with(str(index))
+        self.assertIn('other', keys)
+        self.assertNotIn('greeting', keys)
@@ -0,0 +1,29 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase
+
+from django_localizer.watch import StatWatcher
+
+
+class TestStatWatcher(TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = Path(tmp_dir.name)
+        self.stew_file = self.dir / 'strings.stew'
+        self.stew_file.write_text('[key]\n')
+
+
+    def test_returns_changed_files(self):
+        def modify():
+            self.stew_file.write_text('[other_key]\n')
+            os.utime(self.stew_file, ns=(0, 0))
+
+        timer = threading.Timer(0.05, modify)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        changed = StatWatcher(interval=0.01).wait({self.stew_file, self.dir / 'other.stew'})
+        self.assertEqual(changed, {self.stew_file})